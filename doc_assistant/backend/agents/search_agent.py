@@ -426,6 +426,9 @@ class SearchAgent:
         
         #st.info(f"🔍 Recherche dans {total_kbs} bases de connaissances")
         
+        # Titres des bases indexés par id, lus une seule fois pour toute la boucle
+        kb_titles = {kb["id"]: kb["title"] for kb in self.kb_manager.list_knowledge_bases()}
+        
         for idx, mapping in enumerate(kb_mappings, 1):
             # Charger les informations de la base
             kb = self.kb_manager.load_knowledge_base(mapping.kb_id)
@@ -434,9 +437,7 @@ class SearchAgent:
                 continue
                 
             # Récupérer le titre de la base pour les messages
-            kb_info = next((kb for kb in self.kb_manager.list_knowledge_bases() 
-                        if kb["id"] == mapping.kb_id), None)
-            kb_title = kb_info["title"] if kb_info else mapping.kb_id
+            kb_title = kb_titles.get(mapping.kb_id, mapping.kb_id)
             
             st.info(f"📚 [{idx}/{total_kbs}] Recherche dans la base: {kb_title} (score de mapping: {mapping.relevance_score:.2f})")
 
@@ -4,9 +4,16 @@ Knowledge base manager main class
 Created: 2024-10-30
 """
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import hashlib
 import json
-from typing import Optional, List, Dict, Any, Literal
+from typing import Optional, List, Dict, Any, Literal, Tuple
 import os
+import stat
+import tempfile
+import threading
+import weakref
 import chromadb
 from dsrag.knowledge_base import KnowledgeBase 
 from dsrag.database.vector.chroma_db import ChromaDB
@@ -26,6 +33,60 @@ from dsrag.reranker import (
 from dsrag.llm import OpenAIChatAPI, AnthropicChatAPI
 from backend.utils.string_nomalizer import StringNormalizer
 
+@lru_cache(maxsize=128)
+def _load_kb_metadata(path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """Lit un fichier de métadonnées ; mis en cache tant que (mtime, taille) ne changent pas"""
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def _read_kb_metadata(path: str) -> Dict[str, Any]:
+    """Métadonnées d'une base (copie modifiable), relues uniquement si le fichier a changé"""
+    st_info = os.stat(path)
+    return dict(_load_kb_metadata(path, st_info.st_mtime_ns, st_info.st_size))
+
+# Instances d'embedding propres à chaque thread : les clients HTTP des fournisseurs
+# (OpenAI, Cohere, Voyage) ne garantissent pas leur sûreté entre threads
+_thread_embeddings = threading.local()
+
+def _make_embedding(provider: str, model_name: str, dimension: int, model_class: type) -> Embedding:
+    """Instance d'embedding réutilisée par configuration au sein du thread courant (client HTTP et pool conservés)"""
+    instances = getattr(_thread_embeddings, "instances", None)
+    if instances is None:
+        instances = _thread_embeddings.instances = {}
+    key = (provider, model_name, dimension, model_class)
+    embedding = instances.get(key)
+    if embedding is None:
+        embedding = instances[key] = model_class(model=model_name, dimension=dimension)
+    return embedding
+
+class _HashIndex:
+    """
+    Index {empreinte du contenu: doc_id} d'une base, avec son inverse {doc_id: empreinte}.
+    Persisté en journal : une ligne JSON [empreinte, doc_id] par ajout, [null, doc_id] par retrait.
+    """
+    __slots__ = ('by_hash', 'by_doc', 'log_lines')
+
+    def __init__(self):
+        self.by_hash: Dict[str, str] = {}
+        self.by_doc: Dict[str, str] = {}
+        self.log_lines = 0  # Lignes du journal sur disque (déclenche le compactage)
+
+    def add(self, content_hash: str, doc_id: str) -> None:
+        # Un doc_id réingéré avec un autre contenu ne doit plus répondre à l'ancienne empreinte
+        self.forget(doc_id)
+        previous = self.by_hash.get(content_hash)
+        if previous is not None:
+            self.by_doc.pop(previous, None)
+        self.by_hash[content_hash] = doc_id
+        self.by_doc[doc_id] = content_hash
+
+    def forget(self, doc_id: str) -> bool:
+        content_hash = self.by_doc.pop(doc_id, None)
+        if content_hash is None:
+            return False
+        self.by_hash.pop(content_hash, None)
+        return True
+
 class KnowledgeBaseManager:
     """Gestionnaire de bases de connaissances utilisant ChromaDB comme stockage vectoriel"""
     
@@ -79,6 +140,19 @@ class KnowledgeBaseManager:
         self.metadata_dir = os.path.join(self.storage_directory, "metadata")
         os.makedirs(self.metadata_dir, exist_ok=True)
         self.chroma_client = chromadb.PersistentClient(path=self.vector_storage_path)
+        # Registre des bases ouvertes dans ce processus (références faibles)
+        self._open_kbs: "weakref.WeakValueDictionary[str, KnowledgeBase]" = weakref.WeakValueDictionary()
+        # Index {empreinte du contenu: doc_id} par base, chargé à la demande
+        self._hash_indexes: Dict[str, _HashIndex] = {}
+        self._hash_lock = threading.Lock()
+        # Un seul écrivain par base : toutes les instances KnowledgeBase d'une base partagent
+        # sa collection Chroma et son fichier SQLite de chunks
+        self._write_locks: Dict[str, threading.Lock] = {}
+        self._write_locks_guard = threading.Lock()
+        # Sérialise les lecture/modification/écriture des métadonnées (instance partagée entre sessions)
+        self._metadata_lock = threading.RLock()
+        # Compteur par base, incrémenté à chaque marquage "espace disque à recalculer"
+        self._disk_size_generations: Dict[str, int] = {}
 
     def _create_embedding_model(
         self,
@@ -100,7 +174,7 @@ class KnowledgeBaseManager:
         if dimension is None:
             dimension = 1536#self.SUPPORTED_EMBEDDING_MODELS[provider]["default_dimensions"][model_name]
 
-        return model_class(model=model_name, dimension=dimension)
+        return _make_embedding(provider, model_name, dimension, model_class)
 
     def _create_reranker(
         self,
@@ -217,11 +291,34 @@ class KnowledgeBaseManager:
                 reranker=reranker,  # Le reranker peut être modifié sans affecter les embeddings
                 exists_ok=True
             )
+            self._open_kbs[kb_id] = kb
             return kb
         except Exception as e:
             print(f"Erreur lors du chargement de la base {kb_id}: {str(e)}")
             return None
 
+    def close_knowledge_base(self, kb_id: str) -> bool:
+        """
+        Ferme les connexions d'une base ouverte dans ce processus, sans la recharger
+        
+        Returns:
+            bool: True si une base ouverte a été fermée, False si aucune n'était ouverte
+        """
+        kb = self._open_kbs.pop(kb_id, None)
+        if kb is None:
+            return False
+
+        if hasattr(kb.chunk_db, 'close'):
+            kb.chunk_db.close()
+        if hasattr(kb.vector_db, 'close'):
+            kb.vector_db.close()
+        return True
+
+    def _write_lock(self, kb_id: str) -> threading.Lock:
+        """Verrou sérialisant les écritures (ajouts, suppressions) dans une base"""
+        with self._write_locks_guard:
+            return self._write_locks.setdefault(kb_id, threading.Lock())
+
     def add_document(
         self,
         kb_id: str,
@@ -239,36 +336,222 @@ class KnowledgeBaseManager:
             if not kb:
                 raise Exception(f"Base de connaissances {kb_id} introuvable")
             
-            # Initialisation des dictionnaires par défaut    
-            metadata = metadata or {}
-            auto_context_config = auto_context_config or {}
-            semantic_sectioning_config = semantic_sectioning_config or {}
-                
-            if not doc_id:
-                if file_path:
-                    doc_id = os.path.basename(file_path)
-                else:
-                    doc_id = f"doc_{len(kb.chunk_db.get_all_doc_ids())}"
-
-            # Normaliser le doc_id pour éviter les problèmes SQLite
-            normalized_doc_id = StringNormalizer.normalize_doc_id(doc_id)
-        
-            # Ajout du document avec des paramètres valides
-            kb.add_document(
-                doc_id=normalized_doc_id,
-                text=text,
-                file_path=file_path,
-                auto_context_config=auto_context_config,
-                semantic_sectioning_config=semantic_sectioning_config,
-                chunk_size=chunk_size,
-                min_length_for_chunking=min_length_for_chunking,
-                metadata=metadata
-            )
+            with self._write_lock(kb_id):
+                normalized_doc_id = self._add_to_kb(
+                    kb,
+                    file_path=file_path,
+                    text=text,
+                    doc_id=doc_id,
+                    metadata=metadata,
+                    auto_context_config=auto_context_config,
+                    semantic_sectioning_config=semantic_sectioning_config,
+                    chunk_size=chunk_size,
+                    min_length_for_chunking=min_length_for_chunking
+                )
+            if metadata and metadata.get('content_hash'):
+                self._record_hashes(kb_id, [(metadata['content_hash'], normalized_doc_id)])
+            self.mark_disk_size_stale(kb_id)
             return True
                 
         except Exception as e:
             raise Exception(f"Erreur lors de l'ajout du document dans {kb_id}: {str(e)}")
 
+    def add_documents(self, kb_id: str, docs: List[Dict[str, Any]]) -> List[bool]:
+        """
+        Ajoute plusieurs documents à une base en ne la chargeant qu'une seule fois.
+        Les ajouts d'une même base sont sérialisés, y compris entre lots de threads différents.
+        
+        Args:
+            kb_id: Identifiant de la base
+            docs: Arguments de add_document pour chaque document (file_path, doc_id, metadata, ...)
+            
+        Returns:
+            List[bool]: Succès de chaque document, dans l'ordre de `docs`
+        """
+        kb = self.load_knowledge_base(kb_id)
+        if not kb:
+            raise Exception(f"Base de connaissances {kb_id} introuvable")
+        
+        results = []
+        hashes: List[Tuple[str, str]] = []
+        write_lock = self._write_lock(kb_id)
+        for doc in docs:
+            try:
+                with write_lock:
+                    normalized_doc_id = self._add_to_kb(kb, **doc)
+                results.append(True)
+                content_hash = (doc.get('metadata') or {}).get('content_hash')
+                if content_hash:
+                    hashes.append((content_hash, normalized_doc_id))
+            except Exception as e:
+                print(f"Erreur lors de l'ajout du document {doc.get('doc_id') or doc.get('file_path')} dans {kb_id}: {str(e)}")
+                results.append(False)
+        
+        if any(results):
+            self._record_hashes(kb_id, hashes)
+            self.mark_disk_size_stale(kb_id)
+        return results
+
+    @staticmethod
+    def _add_to_kb(
+        kb: KnowledgeBase,
+        file_path: str = "",
+        text: str = "",
+        doc_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        auto_context_config: Optional[Dict[str, Any]] = None,
+        semantic_sectioning_config: Optional[Dict[str, Any]] = None,
+        chunk_size: int = 800,
+        min_length_for_chunking: int = 1600,
+    ) -> str:
+        """Ajoute un document à une base déjà chargée ; renvoie son doc_id normalisé"""
+        # Initialisation des dictionnaires par défaut    
+        metadata = metadata or {}
+        auto_context_config = auto_context_config or {}
+        semantic_sectioning_config = semantic_sectioning_config or {}
+            
+        if not doc_id:
+            if file_path:
+                doc_id = os.path.basename(file_path)
+            else:
+                doc_id = f"doc_{len(kb.chunk_db.get_all_doc_ids())}"
+
+        # Normaliser le doc_id pour éviter les problèmes SQLite
+        normalized_doc_id = StringNormalizer.normalize_doc_id(doc_id)
+    
+        # Ajout du document avec des paramètres valides
+        kb.add_document(
+            doc_id=normalized_doc_id,
+            text=text,
+            file_path=file_path,
+            auto_context_config=auto_context_config,
+            semantic_sectioning_config=semantic_sectioning_config,
+            chunk_size=chunk_size,
+            min_length_for_chunking=min_length_for_chunking,
+            metadata=metadata
+        )
+        return normalized_doc_id
+
+    @staticmethod
+    def content_hash(file_path: str) -> str:
+        """Empreinte BLAKE2b du contenu d'un fichier, lu par blocs de 1 MiB"""
+        digest = hashlib.blake2b(digest_size=16)
+        with open(file_path, 'rb') as f:
+            while chunk := f.read(1 << 20):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _hash_index_path(self, kb_id: str) -> str:
+        return os.path.join(self.metadata_dir, f"{kb_id}.hashes")
+
+    def _get_hash_index(self, kb_id: str) -> _HashIndex:
+        """Index des empreintes d'une base, rejoué depuis son journal (à appeler sous self._hash_lock)"""
+        index = self._hash_indexes.get(kb_id)
+        if index is None:
+            index = _HashIndex()
+            damaged = False
+            try:
+                with open(self._hash_index_path(kb_id), 'r') as f:
+                    for line in f:
+                        index.log_lines += 1
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            record = None
+                        if not (isinstance(record, list) and len(record) == 2):
+                            damaged = True  # Ligne tronquée par une écriture interrompue
+                            continue
+                        content_hash, doc_id = record
+                        if content_hash is None:
+                            index.forget(doc_id)
+                        else:
+                            index.add(content_hash, doc_id)
+            except FileNotFoundError:
+                pass
+            self._hash_indexes[kb_id] = index
+            # Compactage si le journal est endommagé (les ajouts suivants prolongeraient la ligne
+            # tronquée) ou si les entrées remplacées ou retirées y dominent
+            if damaged or index.log_lines > 2 * len(index.by_hash) + 64:
+                self._write_hash_index(kb_id, index)
+        return index
+
+    def _write_hash_index(self, kb_id: str, index: _HashIndex) -> None:
+        """Réécriture atomique et compacte du journal des empreintes (à appeler sous self._hash_lock)"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.metadata_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                for content_hash, doc_id in index.by_hash.items():
+                    f.write(json.dumps([content_hash, doc_id]) + "\n")
+            os.replace(tmp_path, self._hash_index_path(kb_id))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        index.log_lines = len(index.by_hash)
+
+    def _append_hash_log(self, kb_id: str, index: _HashIndex, records: List[List[Optional[str]]]) -> None:
+        """Ajoute des lignes au journal des empreintes, sans le réécrire (à appeler sous self._hash_lock)"""
+        with open(self._hash_index_path(kb_id), 'a') as f:
+            f.write("".join(json.dumps(record) + "\n" for record in records))
+        index.log_lines += len(records)
+
+    def find_document_by_hash(self, kb_id: str, content_hash: str) -> Optional[str]:
+        """
+        Recherche un document déjà ingéré dans la base à partir de l'empreinte de son contenu
+        
+        Returns:
+            Optional[str]: doc_id du document existant, None si le contenu est inconnu
+        """
+        with self._hash_lock:
+            doc_id = self._get_hash_index(kb_id).by_hash.get(content_hash)
+        if doc_id is None:
+            return None
+        
+        # L'index n'est tenu à jour que par ce gestionnaire : un document renommé ou supprimé
+        # par un script (normalize_kb_id, clean_kbs) y laisse une entrée orpheline, retirée ici
+        kb = self.load_knowledge_base(kb_id)
+        if kb is not None:
+            try:
+                exists = kb.chunk_db.get_document(doc_id, include_content=False) is not None
+            except Exception as e:
+                print(f"Erreur lors de la vérification du document {doc_id}: {str(e)}")
+                return doc_id
+            if not exists:
+                self._forget_hashes(kb_id, doc_id)
+                return None
+        return doc_id
+
+    def _record_hashes(self, kb_id: str, entries: List[Tuple[str, str]]) -> None:
+        """Mémorise les empreintes (empreinte, doc_id) des documents ajoutés"""
+        if not entries:
+            return
+        try:
+            with self._hash_lock:
+                index = self._get_hash_index(kb_id)
+                for content_hash, doc_id in entries:
+                    index.add(content_hash, doc_id)
+                self._append_hash_log(kb_id, index, [list(entry) for entry in entries])
+        except Exception as e:
+            print(f"Erreur lors de la mise à jour des empreintes de {kb_id}: {str(e)}")
+
+    def forget_kb_hashes(self, kb_id: str) -> None:
+        """Supprime l'index des empreintes d'une base (en mémoire et sur disque), à sa suppression"""
+        with self._hash_lock:
+            self._hash_indexes.pop(kb_id, None)
+            try:
+                os.remove(self._hash_index_path(kb_id))
+            except FileNotFoundError:
+                pass
+
+    def _forget_hashes(self, kb_id: str, doc_id: str) -> None:
+        """Retire de l'index les empreintes d'un document supprimé"""
+        try:
+            with self._hash_lock:
+                index = self._get_hash_index(kb_id)
+                if index.forget(doc_id):
+                    self._append_hash_log(kb_id, index, [[None, doc_id]])
+        except Exception as e:
+            print(f"Erreur lors de la mise à jour des empreintes de {kb_id}: {str(e)}")
+
     def delete_document(self, kb_id: str, doc_id: str) -> bool:
         """
         Supprime un document d'une base de connaissances
@@ -277,12 +560,29 @@ class KnowledgeBaseManager:
             kb = self.load_knowledge_base(kb_id)
             if not kb:
                 return False
-            kb.delete_document(doc_id)
+            with self._write_lock(kb_id):
+                kb.delete_document(doc_id)
+            self._forget_hashes(kb_id, doc_id)
+            self.mark_disk_size_stale(kb_id)
             return True
         except Exception as e:
             print(f"Erreur lors de la suppression du document {doc_id}: {str(e)}")
             return False
 
+    @staticmethod
+    def _format_document(doc: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Met en forme un document issu de la base SQLite des chunks
+        """
+        return {
+            'id': doc['id'],
+            'title': doc['title'],
+            'content': doc['content'],
+            'summary': doc['summary'],
+            'created_on': doc['created_on'],
+            'metadata': doc.get('metadata', {}),
+        }
+
     def get_document(self, kb_id: str, doc_id: str, include_content: bool = True) -> Optional[Dict[str, Any]]:
         """
         Récupère les informations complètes d'un document
@@ -296,14 +596,7 @@ class KnowledgeBaseManager:
             if not doc:
                 return None
             
-            return {
-                'id': doc['id'],
-                'title': doc['title'],
-                'content': doc['content'],
-                'summary': doc['summary'],
-                'created_on': doc['created_on'],
-                'metadata': doc.get('metadata', {}),
-            }
+            return self._format_document(doc)
         except Exception as e:
             print(f"Erreur lors de la récupération du document {doc_id}: {str(e)}")
             return None
@@ -317,17 +610,32 @@ class KnowledgeBaseManager:
             if not kb:
                 return []
             
+            # La base est chargée une seule fois pour tous les documents
             documents = []
             for doc_id in kb.chunk_db.get_all_doc_ids():
-                doc = self.get_document(kb_id, doc_id, include_content=False)
+                doc = kb.chunk_db.get_document(doc_id, include_content=False)
                 if doc:
-                    documents.append(doc)
+                    documents.append(self._format_document(doc))
             
             return documents
         except Exception as e:
             print(f"Erreur lors de la liste des documents de {kb_id}: {str(e)}")
             return []
 
+    def list_documents_bulk(self, kb_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Liste les documents de plusieurs bases en un seul appel.
+        Les bases sont lues en parallèle : la latence est celle de la plus lente.
+        
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: {kb_id: documents}, dans l'ordre de `kb_ids`
+        """
+        kb_ids = list(dict.fromkeys(kb_ids))
+        if not kb_ids:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(8, len(kb_ids))) as pool:
+            return dict(zip(kb_ids, pool.map(self.list_documents, kb_ids)))
+
     def list_knowledge_bases(self) -> List[Dict[str, Any]]:
             """
             Liste toutes les bases de connaissances disponibles
@@ -342,21 +650,106 @@ class KnowledgeBaseManager:
                 if filename.endswith('.json'):
                     kb_id = filename[:-5]  # Enlever l'extension .json
                     try:
-                        with open(os.path.join(self.metadata_dir, filename), 'r') as f:
-                            metadata = json.load(f)
-                            kb_list.append({
-                                'id': kb_id,
-                                'title': metadata.get('title', kb_id),
-                                'description': metadata.get('description', ''),
-                                'language': metadata.get('language', 'en'),
-                                'created_on': metadata.get('created_on'),
-                            })
+                        metadata = _read_kb_metadata(os.path.join(self.metadata_dir, filename))
+                        kb_list.append({
+                            'id': kb_id,
+                            'title': metadata.get('title', kb_id),
+                            'description': metadata.get('description', ''),
+                            'language': metadata.get('language', 'en'),
+                            'created_on': metadata.get('created_on'),
+                            'disk_size_bytes': metadata.get('disk_size_bytes'),
+                            'disk_size_stale': metadata.get('disk_size_stale', True),
+                        })
                     except Exception as e:
                         print(f"Erreur lors de la lecture des métadonnées de {kb_id}: {str(e)}")
                         continue
                         
             return kb_list
         
+    def _update_kb_metadata(self, kb_id: str, **fields: Any) -> None:
+        """
+        Met à jour des champs du fichier de métadonnées d'une base (écriture atomique)
+        """
+        metadata_path = os.path.join(self.metadata_dir, f"{kb_id}.json")
+        with self._metadata_lock:
+            try:
+                metadata = _read_kb_metadata(metadata_path)
+            except FileNotFoundError:
+                return
+            # Rien à écrire si les champs ont déjà ces valeurs (ex. ingestion de N fichiers)
+            if all(metadata.get(key) == value for key, value in fields.items()):
+                return
+            metadata.update(fields)
+
+            fd, tmp_path = tempfile.mkstemp(dir=self.metadata_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(metadata, f, indent=4)
+                os.replace(tmp_path, metadata_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+    def mark_disk_size_stale(self, kb_id: str) -> None:
+        """
+        Signale que l'espace disque mémorisé pour la base doit être recalculé
+        """
+        with self._metadata_lock:
+            self._disk_size_generations[kb_id] = self._disk_size_generations.get(kb_id, 0) + 1
+            try:
+                self._update_kb_metadata(kb_id, disk_size_stale=True)
+            except Exception as e:
+                print(f"Erreur lors de la mise à jour des métadonnées de {kb_id}: {str(e)}")
+
+    def compute_disk_size(self, kb_id: str) -> int:
+        """
+        Calcule l'espace disque occupé par une base (métadonnées, chunks et vecteurs)
+        """
+        storage_paths = [
+            os.path.join(self.metadata_dir, f"{kb_id}.json"),
+            self._hash_index_path(kb_id),
+            os.path.join(self.storage_directory, "chunk_storage", f"{kb_id}.db"),
+            os.path.join(self.vector_storage_path, kb_id)
+        ]
+
+        total_size = 0
+        for path in storage_paths:
+            try:
+                path_stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if stat.S_ISREG(path_stat.st_mode):
+                total_size += path_stat.st_size
+            elif stat.S_ISDIR(path_stat.st_mode):
+                for root, _, files in os.walk(path):
+                    for filename in files:
+                        try:
+                            total_size += os.path.getsize(os.path.join(root, filename))
+                        except OSError:
+                            continue
+        return total_size
+
+    def refresh_disk_size(self, kb_id: str) -> int:
+        """
+        Recalcule l'espace disque d'une base et le mémorise dans ses métadonnées
+        
+        Returns:
+            int: Taille totale en octets
+        """
+        with self._metadata_lock:
+            generation = self._disk_size_generations.get(kb_id, 0)
+        total_size = self.compute_disk_size(kb_id)
+        with self._metadata_lock:
+            # Une modification pendant le calcul laisse la taille marquée à recalculer
+            fields = {'disk_size_bytes': total_size}
+            if self._disk_size_generations.get(kb_id, 0) == generation:
+                fields['disk_size_stale'] = False
+            try:
+                self._update_kb_metadata(kb_id, **fields)
+            except Exception as e:
+                print(f"Erreur lors de la mise à jour des métadonnées de {kb_id}: {str(e)}")
+        return total_size
+
     def delete_knowledge_base(self, kb_id: str) -> bool:
         """
         Supprime une base de connaissances et tous ses documents
@@ -381,8 +774,9 @@ class KnowledgeBaseManager:
             # Supprimer la base via dsRAG
             kb.delete()
             
-            # Supprimer les métadonnées
+            # Supprimer les métadonnées et l'index des empreintes
             os.remove(metadata_path)
+            self.forget_kb_hashes(kb_id)
             
             # Supprimer la collection ChromaDB
             try:
@@ -1,5 +1,7 @@
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
+import hashlib
+import json
 
 @dataclass
 class DocumentFilter:
@@ -22,6 +24,26 @@ class SearchFilter:
         """Vérifie si des filtres sont actifs"""
         return bool(self.kb_ids or self.doc_ids)
     
+    def canonical(self) -> Tuple[Tuple[str, ...], Tuple[Tuple[str, Tuple[str, ...]], ...]]:
+        """Forme canonique (triée, indépendante de l'ordre de sélection) du filtre"""
+        return (
+            tuple(sorted(self.kb_ids or ())),
+            tuple(sorted(
+                (kb_id, tuple(sorted(doc_ids)))
+                for kb_id, doc_ids in (self.doc_ids or {}).items()
+            ))
+        )
+    
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, SearchFilter):
+            return NotImplemented
+        return self.canonical() == other.canonical()
+    
+    def cache_key(self) -> str:
+        """Clé stable entre processus, utilisable avec st.cache_data(persist="disk")"""
+        payload = json.dumps(self.canonical(), separators=(",", ":"))
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+    
     def get_kb_ids(self) -> List[str]:
         """Retourne la liste des IDs de bases de connaissances filtrées"""
         if self.kb_ids:
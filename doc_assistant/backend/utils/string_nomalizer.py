@@ -4,6 +4,10 @@ import hashlib
 import unicodedata
 from typing import Optional
 
+# Apostrophes et guillemets vers des underscores, en une seule passe (str.translate)
+_QUOTES_TRANS = str.maketrans({"'": "_", '"': "_"})
+_VALID_DOC_ID_RE = re.compile(r'^[a-z][a-z0-9-]*$')
+
 class StringNormalizer:
     """Utilitaire pour normaliser les chaînes de caractères"""
     
@@ -34,7 +38,7 @@ class StringNormalizer:
         #name = unicodedata.normalize('NFKD', name).encode('ASCII', 'ignore').decode('utf-8')
     
         # 3. Remplacer spécifiquement les apostrophes et guillemets par des underscores
-        name = re.sub(r'[\'"]', '_', name)
+        name = name.translate(_QUOTES_TRANS)
     
         # 4. Remplacer les autres caractères spéciaux par des tirets
         #name = re.sub(r'[^a-z0-9_]+', '-', name)  # Modifié pour préserver les underscores
@@ -69,8 +73,7 @@ class StringNormalizer:
             return False
             
         # Vérifier le format général avec une regex
-        pattern = r'^[a-z][a-z0-9-]*$'
-        return bool(re.match(pattern, doc_id))
+        return bool(_VALID_DOC_ID_RE.match(doc_id))
 
     @staticmethod
     def sanitize_filename(filename: str) -> str:
@@ -5,6 +5,68 @@ from backend.agents.orchestrator import AgentOrchestrator
 from backend.agents.no_result_handler_agent import SearchFailureAnalysis
 from backend.utils.filter_utils import SearchFilter
 
+_CHAT_CSS = """
+    <style>
+    .source-container {
+        border: 1px solid #333;
+        border-radius: 8px;
+        padding: 10px;
+        margin: 10px 0;
+        background-color: #1e1e1e;  /* Fond sombre */
+        color: #ffffff;  /* Texte blanc */
+    }
+    .source-header {
+        font-weight: bold;
+        color: #64B5F6;  /* Bleu plus clair pour meilleur contraste */
+        margin-bottom: 5px;
+        font-size: 1.1em;
+    }
+    .document-item {
+        padding: 12px;
+        margin: 5px 0;
+        border-left: 3px solid #4CAF50;
+        background-color: #2d2d2d;  /* Fond légèrement plus clair */
+        color: #ffffff;
+        border-radius: 4px;
+    }
+    .document-item:hover {
+        background-color: #363636;  /* Effet hover subtil */
+        transition: background-color 0.2s ease;
+    }
+    .relevance-badge {
+        padding: 3px 8px;
+        border-radius: 12px;
+        font-size: 0.8em;
+        font-weight: 500;
+    }
+    .page-info {
+        color: #aaaaaa;  /* Gris clair pour info secondaire */
+        font-size: 0.9em;
+        font-style: italic;
+        margin-top: 4px;
+    }
+    .source-divider {
+        margin: 10px 0;
+        border-top: 1px solid #333;
+    }
+    /* Style pour l'expander de Streamlit */
+    .streamlit-expanderHeader {
+        background-color: #1e1e1e !important;
+        color: #ffffff !important;
+    }
+    /* Style pour le contenu de l'expander */
+    .streamlit-expanderContent {
+        background-color: #1e1e1e !important;
+        border: none !important;
+    }
+    </style>
+"""
+
+@st.cache_resource
+def _inject_chat_styles():
+    """Injecte les styles CSS ; l'élément est rejoué par le cache à chaque rerun"""
+    st.markdown(_CHAT_CSS, unsafe_allow_html=True)
+
 class ChatWindow:
     def __init__(self, orchestrator: AgentOrchestrator):
         self.orchestrator = orchestrator
@@ -15,62 +77,7 @@ class ChatWindow:
 
     def _init_styles(self):
         """Initialise les styles CSS pour un thème sombre"""
-        st.markdown("""
-            <style>
-            .source-container {
-                border: 1px solid #333;
-                border-radius: 8px;
-                padding: 10px;
-                margin: 10px 0;
-                background-color: #1e1e1e;  /* Fond sombre */
-                color: #ffffff;  /* Texte blanc */
-            }
-            .source-header {
-                font-weight: bold;
-                color: #64B5F6;  /* Bleu plus clair pour meilleur contraste */
-                margin-bottom: 5px;
-                font-size: 1.1em;
-            }
-            .document-item {
-                padding: 12px;
-                margin: 5px 0;
-                border-left: 3px solid #4CAF50;
-                background-color: #2d2d2d;  /* Fond légèrement plus clair */
-                color: #ffffff;
-                border-radius: 4px;
-            }
-            .document-item:hover {
-                background-color: #363636;  /* Effet hover subtil */
-                transition: background-color 0.2s ease;
-            }
-            .relevance-badge {
-                padding: 3px 8px;
-                border-radius: 12px;
-                font-size: 0.8em;
-                font-weight: 500;
-            }
-            .page-info {
-                color: #aaaaaa;  /* Gris clair pour info secondaire */
-                font-size: 0.9em;
-                font-style: italic;
-                margin-top: 4px;
-            }
-            .source-divider {
-                margin: 10px 0;
-                border-top: 1px solid #333;
-            }
-            /* Style pour l'expander de Streamlit */
-            .streamlit-expanderHeader {
-                background-color: #1e1e1e !important;
-                color: #ffffff !important;
-            }
-            /* Style pour le contenu de l'expander */
-            .streamlit-expanderContent {
-                background-color: #1e1e1e !important;
-                border: none !important;
-            }
-            </style>
-        """, unsafe_allow_html=True)
+        _inject_chat_styles()
         
     async def process_message(
         self, 
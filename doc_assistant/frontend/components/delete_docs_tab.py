@@ -4,6 +4,7 @@ import streamlit as st
 import os
 from datetime import datetime
 from backend.kb_management.manager import KnowledgeBaseManager
+from frontend.utils.resources import invalidate_kb_caches
 from pathlib import Path
 
 class DeleteDocsComponent:
@@ -20,11 +21,12 @@ class DeleteDocsComponent:
             st.warning("Aucune base de connaissances disponible.")
             return
 
-        # Sélection de la base
+        # Sélection de la base (titres indexés par id : recherche en O(1) par option)
+        kb_titles = {kb["id"]: kb["title"] for kb in kb_list}
         selected_kb = st.selectbox(
             "Base de connaissances",
-            options=[kb["id"] for kb in kb_list],
-            format_func=lambda x: f"{x} - {next((kb['title'] for kb in kb_list if kb['id'] == x), '')}",
+            options=list(kb_titles),
+            format_func=lambda x: f"{x} - {kb_titles.get(x, '')}",
             key="delete_kb_select"
         )
         
@@ -72,12 +74,13 @@ class DeleteDocsComponent:
                 # Bouton de suppression
                 if st.button("🗑️", key=f"delete_{doc_id}", help=f"Supprimer {doc_id}"):
                     if st.session_state.get(f"confirm_{doc_id}", False):
-                        try:
-                            kb.delete_document(doc_id)
+                        # Via le gestionnaire : taille disque et index des empreintes mis à jour
+                        if self.kb_manager.delete_document(kb.kb_id, doc_id):
+                            invalidate_kb_caches()
                             st.success(f"Document '{doc_id}' supprimé avec succès")
                             st.rerun()
-                        except Exception as e:
-                            st.error(f"Erreur lors de la suppression: {str(e)}")
+                        else:
+                            st.error(f"Erreur lors de la suppression du document '{doc_id}'")
                     else:
                         st.session_state[f"confirm_{doc_id}"] = True
                         st.warning("Confirmer la suppression ?")
@@ -5,8 +5,30 @@ from typing import Optional
 from pathlib import Path
 import shutil
 import os
+import stat
+import subprocess
 import time
 from backend.kb_management.manager import KnowledgeBaseManager
+from frontend.utils.resources import invalidate_kb_caches, submit
+
+# Au-delà, le sélecteur est précédé d'un champ de recherche et limité aux premières correspondances
+_KB_SELECT_LIMIT = 50
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _kb_num_docs(_kb_manager: KnowledgeBaseManager, kb_id: str, chunk_db_mtime: float) -> Optional[int]:
+    """Nombre de documents d'une base, mis en cache par (kb_id, mtime de la base SQLite)"""
+    kb = _kb_manager.load_knowledge_base(kb_id)
+    if not kb:
+        return None
+    return len(kb.chunk_db.get_all_doc_ids())
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _kb_total_chars(_kb_manager: KnowledgeBaseManager, kb_id: str, chunk_db_mtime: float) -> Optional[int]:
+    """Volume total en caractères d'une base, mis en cache par (kb_id, mtime de la base SQLite)"""
+    kb = _kb_manager.load_knowledge_base(kb_id)
+    if not kb or not hasattr(kb.chunk_db, 'get_total_num_characters'):
+        return None
+    return kb.chunk_db.get_total_num_characters()
 
 class DeleteKBComponent:
     def __init__(self, kb_manager: KnowledgeBaseManager):
@@ -15,45 +37,50 @@ class DeleteKBComponent:
             st.session_state.kb_to_delete = None
         if 'delete_confirmed' not in st.session_state:
             st.session_state.delete_confirmed = False
+        if 'kb_delete_selected' not in st.session_state:
+            st.session_state.kb_delete_selected = None
             
     def _reset_state(self):
         """Réinitialise l'état de suppression"""
         st.session_state.kb_to_delete = None
         st.session_state.delete_confirmed = False
 
+    @staticmethod
+    def _stat_mode(path: Path) -> Optional[int]:
+        """Retourne le st_mode du chemin (un seul stat), ou None s'il n'existe pas"""
+        try:
+            return os.stat(path).st_mode
+        except FileNotFoundError:
+            return None
+
     def _verify_permissions(self, paths: list[Path]) -> tuple[bool, str]:
-        """Vérifie les permissions pour la suppression"""
+        """
+        Vérifie les permissions pour la suppression.
+        Supprimer une entrée nécessite l'écriture (w+x) sur son dossier parent :
+        on teste donc les dossiers, jamais les fichiers un par un.
+        """
         for path in paths:
-            if path.exists():
-                try:
-                    if path.is_file():
-                        # Tester l'accès en écriture au fichier
-                        os.access(path, os.W_OK)
-                    elif path.is_dir():
-                        # Tester l'accès en écriture au dossier
-                        os.access(path, os.W_OK)
-                        # Tester l'accès aux fichiers dans le dossier
-                        for file in path.rglob('*'):
-                            if not os.access(file, os.W_OK):
-                                return False, f"Permission refusée pour: {file}"
-                except Exception as e:
-                    return False, f"Erreur de vérification des permissions: {str(e)}"
+            mode = self._stat_mode(path)
+            if mode is None:
+                continue
+            try:
+                if not os.access(path.parent, os.W_OK | os.X_OK):
+                    return False, f"Permission refusée pour: {path.parent}"
+                if stat.S_ISDIR(mode):
+                    # Chaque dossier de l'arborescence doit pouvoir être vidé
+                    for root, _, _ in os.walk(path):
+                        if not os.access(root, os.W_OK | os.X_OK):
+                            return False, f"Permission refusée pour: {root}"
+            except Exception as e:
+                return False, f"Erreur de vérification des permissions: {str(e)}"
         return True, ""
 
     def _force_close_connections(self, kb_id: str):
         """Force la fermeture des connexions à la base"""
         try:
-            # Forcer la libération des ressources de la base
-            kb = self.kb_manager.load_knowledge_base(kb_id)
-            if kb:
-                # Fermer explicitement les connexions
-                if hasattr(kb.chunk_db, 'close'):
-                    kb.chunk_db.close()
-                if hasattr(kb.vector_db, 'close'):
-                    kb.vector_db.close()
-                
-                # Attendre un court instant pour la libération des ressources
-                time.sleep(0.5)
+            # Seules les bases déjà ouvertes ont des connexions à fermer :
+            # inutile de recharger la base juste pour la refermer
+            self.kb_manager.close_knowledge_base(kb_id)
         except Exception as e:
             st.warning(f"Avertissement lors de la fermeture des connexions: {str(e)}")
 
@@ -75,55 +102,120 @@ class DeleteKBComponent:
             # Forcer la fermeture des connexions
             self._force_close_connections(kb_id)
 
-            # Supprimer les fichiers avec gestion d'erreurs détaillée
-            for path in paths:
-                if path.exists():
-                    try:
-                        if path.is_file():
-                            path.unlink()
-                        elif path.is_dir():
-                            shutil.rmtree(path)
-                    except PermissionError:
-                        return False, f"Permission refusée pour: {path}"
-                    except FileNotFoundError:
-                        st.warning(f"Fichier déjà supprimé: {path}")
-                    except Exception as e:
-                        return False, f"Erreur lors de la suppression de {path}: {str(e)}"
+            # Le fichier de métadonnées est supprimé directement :
+            # un sous-processus pour un seul petit fichier coûterait plus cher
+            metadata_path, *storage_paths = paths
+            try:
+                self._retry_while_locked(os.unlink, metadata_path)
+            except FileNotFoundError:
+                pass
+            except PermissionError:
+                return False, f"Permission refusée pour: {metadata_path}"
+            
+            # Index des empreintes : sinon une base recréée avec le même id
+            # considérerait ses fichiers comme déjà ingérés
+            try:
+                self.kb_manager.forget_kb_hashes(kb_id)
+            except OSError as e:
+                return False, f"Erreur lors de la suppression de l'index des empreintes: {str(e)}"
 
-            return True, "Suppression réussie"
+            # Stockages chunks/vecteurs supprimés en une seule passe
+            return self._remove_paths(storage_paths)
 
         except Exception as e:
             return False, f"Erreur inattendue: {str(e)}"
 
-    def _show_kb_details(self, kb_id: str) -> Optional[dict]:
+    @staticmethod
+    def _retry_while_locked(remove, path: Path, timeout: float = 1.0, interval: float = 0.05):
+        """
+        Exécute la suppression en réessayant tant que le fichier est verrouillé.
+        Sous Windows, un handle tout juste fermé peut encore bloquer la suppression
+        pendant un court instant ; sous POSIX la première tentative suffit.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return remove(path)
+            except PermissionError:
+                if os.name != "nt" or time.monotonic() >= deadline:
+                    raise
+                time.sleep(interval)
+
+    def _remove_paths(self, paths: list[Path]) -> tuple[bool, str]:
+        """Supprime plusieurs chemins en une seule invocation de `rm -rf` (POSIX)"""
+        existing = [str(path) for path in paths if os.path.lexists(path)]
+        if not existing:
+            return True, "Suppression réussie"
+
+        if os.name == "posix" and shutil.which("rm"):
+            result = subprocess.run(
+                ["rm", "-rf", "--", *existing],
+                check=False,
+                capture_output=True,
+                text=True
+            )
+            if result.returncode != 0:
+                return False, f"Erreur lors de la suppression: {result.stderr.strip()}"
+            return True, "Suppression réussie"
+
+        # Repli (Windows) : suppression chemin par chemin
+        for path in map(Path, existing):
+            mode = self._stat_mode(path)
+            if mode is None:
+                continue
+            try:
+                if stat.S_ISDIR(mode):
+                    self._retry_while_locked(shutil.rmtree, path)
+                else:
+                    self._retry_while_locked(os.unlink, path)
+            except PermissionError:
+                return False, f"Permission refusée pour: {path}"
+            except FileNotFoundError:
+                st.warning(f"Fichier déjà supprimé: {path}")
+            except Exception as e:
+                return False, f"Erreur lors de la suppression de {path}: {str(e)}"
+
+        return True, "Suppression réussie"
+
+    def _chunk_db_mtime(self, kb_id: str) -> float:
+        """Date de modification de la base SQLite des chunks (clé d'invalidation du cache)"""
+        try:
+            return os.path.getmtime(
+                os.path.join(self.kb_manager.storage_directory, "chunk_storage", f"{kb_id}.db")
+            )
+        except OSError:
+            return 0.0
+
+    def _show_kb_details(self, kb_id: str, kb_info: Optional[dict] = None) -> Optional[dict]:
         """Affiche les détails de la base avant suppression"""
         try:
-            # Obtenir les informations détaillées de la base
-            kb = self.kb_manager.load_knowledge_base(kb_id)
-            if not kb:
+            # Espace disque mémorisé dans les métadonnées ; recalcul en arrière-plan
+            # (pendant le chargement de la base) uniquement s'il est périmé
+            kb_info = kb_info or {}
+            disk_size_future = None
+            if kb_info.get('disk_size_stale', True) or kb_info.get('disk_size_bytes') is None:
+                disk_size_future = submit(self.kb_manager.refresh_disk_size, kb_id)
+
+            # Statistiques mises en cache tant que la base SQLite n'a pas changé
+            chunk_db_mtime = self._chunk_db_mtime(kb_id)
+            num_docs = _kb_num_docs(self.kb_manager, kb_id, chunk_db_mtime)
+            if num_docs is None:
                 return None
 
-            # Collecter les statistiques
-            stats = {
-                "num_docs": len(kb.chunk_db.get_all_doc_ids()),
-                "total_chars": kb.chunk_db.get_total_num_characters() if hasattr(kb.chunk_db, 'get_total_num_characters') else None
-            }
+            # Le comptage des caractères parcourt toute la table : uniquement à la demande
+            total_chars = None
+            if st.checkbox("Compter les caractères", value=False, key=f"count_chars_{kb_id}"):
+                total_chars = _kb_total_chars(self.kb_manager, kb_id, chunk_db_mtime)
 
-            # Calculer l'espace disque
-            storage_paths = {
-                "metadata": Path(self.kb_manager.metadata_dir) / f"{kb_id}.json",
-                "chunk_storage": Path(self.kb_manager.storage_directory) / "chunk_storage" / f"{kb_id}.db",
-                "vector_storage": Path(self.kb_manager.vector_storage_path) / kb_id
+            stats = {
+                "num_docs": num_docs,
+                "total_chars": total_chars
             }
 
-            total_size = 0
-            for path in storage_paths.values():
-                if path.exists():
-                    if path.is_file():
-                        total_size += path.stat().st_size
-                    elif path.is_dir():
-                        total_size += sum(f.stat().st_size for f in path.rglob('*') if f.is_file())
-
+            if disk_size_future is not None:
+                total_size = disk_size_future.result()
+            else:
+                total_size = kb_info['disk_size_bytes']
             stats["disk_size"] = total_size
 
             # Afficher les informations
@@ -139,12 +231,6 @@ class DeleteKBComponent:
                 size_mb = round(total_size / (1024 * 1024), 2)
                 st.write(f"💾 Espace disque: {size_mb} MB")
 
-            # Afficher les fichiers à supprimer
-            # with st.expander("🗃️ Fichiers à supprimer", expanded=False):
-            #     for storage_type, path in storage_paths.items():
-            #         if path.exists():
-            #             st.code(f"{storage_type}: {path}")
-
             return stats
 
         except Exception as e:
@@ -161,15 +247,36 @@ class DeleteKBComponent:
             st.warning("Aucune base de connaissances disponible.")
             return
             
-        # Sélection de la base
-        selected_kb = st.selectbox(
-            "Sélectionner une base à supprimer",
-            options=[kb["id"] for kb in kb_list],
-            format_func=lambda x: f"{x} - {next((kb['title'] for kb in kb_list if kb['id'] == x), x)}"
-        )
+        # Index construit une fois : libellés du sélecteur et infos de la base en O(1)
+        kb_by_id = {kb["id"]: kb for kb in kb_list}
+        options = list(kb_by_id)
+        if len(options) > _KB_SELECT_LIMIT:
+            query = st.text_input("🔎 Rechercher une base", key="kb_delete_query").strip().lower()
+            matches = [
+                kb_id for kb_id, kb in kb_by_id.items()
+                if query in kb_id.lower() or query in kb["title"].lower()
+            ]
+            if len(matches) > _KB_SELECT_LIMIT:
+                st.caption(f"{_KB_SELECT_LIMIT} premières bases affichées sur {len(matches)} : affinez la recherche")
+            options = matches[:_KB_SELECT_LIMIT]
+            
+        # Sélection de la base dans un formulaire : les accès disque (statistiques,
+        # espace occupé) ne sont déclenchés qu'à la validation, pas à chaque changement
+        with st.form("delete_kb_form"):
+            form_kb = st.selectbox(
+                "Sélectionner une base à supprimer",
+                options=options,
+                format_func=lambda x: f"{x} - {kb_by_id[x]['title']}"
+            )
+            if st.form_submit_button("Suivant"):
+                if form_kb != st.session_state.kb_delete_selected:
+                    self._reset_state()
+                st.session_state.kb_delete_selected = form_kb
+
+        selected_kb = st.session_state.kb_delete_selected
         
         if selected_kb:
-            kb_info = next((kb for kb in kb_list if kb["id"] == selected_kb), None)
+            kb_info = kb_by_id.get(selected_kb)
             if kb_info:
                 # Afficher les informations de la base
                 st.info(
@@ -183,22 +290,14 @@ class DeleteKBComponent:
                 )
                 
                 # Afficher les détails et statistiques
-                stats = self._show_kb_details(selected_kb)
+                stats = self._show_kb_details(selected_kb, kb_info)
                 
                 if stats:  # Vérifier que les statistiques ont été récupérées avec succès
                     # Zone de suppression
                     if st.session_state.kb_to_delete != selected_kb:
                         st.markdown("---")
-                        st.markdown("""
-                            <style>
-                            div[data-testid="stButton"] button {
-                                background-color: #ff4b4b;
-                                color: white;
-                            }
-                            </style>
-                        """, unsafe_allow_html=True)
                         
-                        if st.button("🗑️ Supprimer cette base"):
+                        if st.button("🗑️ Supprimer cette base", type="primary"):
                             st.session_state.kb_to_delete = selected_kb
                             st.rerun()
                     
@@ -216,26 +315,19 @@ class DeleteKBComponent:
                         
                         col1, col2 = st.columns(2)
                         with col1:
-                            st.markdown("""
-                                <style>
-                                div[data-testid="stButton"] button {
-                                    background-color: #ff4b4b;
-                                    color: white;
-                                }
-                                </style>
-                            """, unsafe_allow_html=True)
-                            
-                            if st.button("✅ Oui, supprimer", key="confirm_delete"):
+                            if st.button("✅ Oui, supprimer", key="confirm_delete", type="primary"):
                                 try:
                                     with st.spinner("Suppression en cours..."):
-                                        # Tentative de suppression directe des fichiers
+                                        # Suppression dans le thread du script (un seul `rm -rf`) :
+                                        # les avertissements st.* restent émis depuis ce thread
                                         success, error_msg = self._delete_kb_files(selected_kb)
                                         
                                         if success:
                                             st.success(f"✅ Base '{kb_info['title']}' supprimée avec succès!")
                                             # Forcer un rechargement pour actualiser la liste des bases
-                                            st.session_state.kb_cache_timestamp = time.time()
+                                            invalidate_kb_caches()
                                             self._reset_state()
+                                            st.session_state.kb_delete_selected = None
                                             st.rerun()
                                         else:
                                             st.error(f"❌ Erreur lors de la suppression: {error_msg}")
@@ -1,15 +1,228 @@
 import streamlit as st
+import pandas as pd
 from pathlib import Path
-from typing import Dict, Any, List, Tuple, Optional
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Mapping, Tuple, Optional
 from datetime import datetime
+import copy
 import tempfile
-import asyncio
+import shutil
+import io
 from functools import lru_cache
+import threading
+import itertools
+from collections import Counter, OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 import time
 from backend.kb_management.manager import KnowledgeBaseManager
-from dsrag.dsparse.file_parsing.element_types import default_element_types
+from frontend.utils.resources import get_kb_labels, get_kb_list, invalidate_kb_caches, with_script_ctx
 import os
 
+# Extensions acceptées à l'ingestion (frozenset : test d'appartenance en O(1))
+_ALLOWED_EXTS = frozenset({".pdf", ".docx", ".txt", ".md"})
+_VLM_EXTS = frozenset({".pdf"})  # Le traitement VLM ne prend en charge que les PDF
+# Types proposés au file_uploader (extensions sans le point)
+_UPLOAD_TYPES = ("pdf", "docx", "txt", "md")
+_VLM_UPLOAD_TYPES = ("pdf",)
+
+# Nombre maximal de fichiers transmis en un seul appel add_documents
+_INGEST_BATCH_SIZE = 32
+
+# Statut de chaque fichier dans le bilan d'une ingestion ; un doublon écarté n'est pas un succès
+_ADDED, _SKIPPED, _FAILED = "ajouté", "ignoré", "échec"
+
+# Options constantes des widgets de configuration
+_EXCLUDE_OPTIONS = ("Header", "Footer", "Equation", "Table")
+_DOC_TYPES = ("rapport", "specification", "procedure", "documentation", "autre")
+
+# Providers et modèles VLM proposés dans la configuration
+_VLM_PROVIDERS = ("gemini", "vertex_ai")
+_VLM_MODELS = {
+    "gemini": ("gemini-1.5-flash-002",),
+    "vertex_ai": ("vertex-ai-vision-model",)
+}
+
+# Suivi de progression borné : au plus _PROGRESS_MAX_ENTRIES fichiers, conservés _PROGRESS_TTL secondes
+_PROGRESS_MAX_ENTRIES = 256
+_PROGRESS_TTL = 300
+_PROGRESS_LOCK = threading.Lock()  # _update_progress est appelé depuis les threads du pool
+_PROGRESS_IDS = itertools.count()  # Identifiants entiers des entrées de progression
+
+
+@lru_cache(maxsize=32)
+def _cached_processing_config(
+    auto_context: bool,
+    semantic_sectioning: bool,
+    chunk_size: int,
+    min_length: int,
+    use_vlm: bool,
+    vlm_provider: str,
+    vlm_model: str,
+    project_id: str,
+    location: str,
+    exclude_elements: Tuple[str, ...],
+    custom_elements: bool,
+    metadata_items: Tuple[Tuple[str, Any], ...]
+) -> Dict[str, Any]:
+    """
+    Construit la configuration d'ingestion à partir des valeurs primitives des widgets,
+    mémoïsée : les reruns sans changement de paramètre ne la reconstruisent pas.
+    Ne pas exposer directement (partagée entre reruns, sessions et threads) :
+    passer par _build_processing_config.
+    """
+    metadata = {
+        key: list(value) if isinstance(value, tuple) else value
+        for key, value in metadata_items
+    }
+    processing_config = {
+        "auto_context_config": {
+            "use_generated_title": False,
+            "get_document_summary": auto_context,
+            "get_section_summaries": auto_context and semantic_sectioning
+        },
+        "semantic_sectioning_config": {
+            "use_semantic_sectioning": semantic_sectioning
+        },
+        "chunk_size": chunk_size,
+        "min_length_for_chunking": min_length,
+        "metadata": metadata
+    }
+
+    if use_vlm:
+        if custom_elements:
+            from dsrag.dsparse.file_parsing.element_types import default_element_types
+            element_types = default_element_types
+        else:
+            element_types = []
+        vlm_config = {
+            "provider": vlm_provider,
+            "model": vlm_model,
+            "exclude_elements": list(exclude_elements),
+            "element_types": element_types
+        }
+        
+        if vlm_provider == "vertex_ai":
+            vlm_config.update({
+                "project_id": project_id,
+                "location": location
+            })
+
+        processing_config.update({
+            "use_vlm": True,
+            "vlm_config": vlm_config,
+            "exclude_elements": list(exclude_elements),
+            "element_types": element_types
+        })
+
+    return processing_config
+
+
+def _build_processing_config(*args: Any) -> Dict[str, Any]:
+    """
+    Copie profonde de la configuration mémoïsée : les dictionnaires et listes imbriqués
+    (auto_context_config, metadata, element_types...) peuvent être modifiés par l'appelant
+    ou par dsRAG sans altérer l'entrée du cache.
+    """
+    return copy.deepcopy(_cached_processing_config(*args))
+
+
+class _UiThrottle:
+    """
+    Limite les rafraîchissements d'UI pendant une ingestion : au plus un par ~1 % de
+    progression et par `interval` secondes ; l'état final est toujours affiché.
+    """
+
+    def __init__(self, total: int, interval: float = 0.25):
+        self.total = total
+        self.step = max(1, total // 100)
+        self.interval = interval
+        self._next = self.step
+        self._last = 0.0
+
+    def ready(self, done: int) -> bool:
+        if done >= self.total:
+            return True
+        if done < self._next:
+            return False
+        now = time.monotonic()
+        if now - self._last < self.interval:
+            return False
+        self._next = done + self.step
+        self._last = now
+        return True
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _list_docs_in_dir(dir_str: str, mtime_ns: int) -> List[Path]:
+    """
+    Fichiers ingérables d'un dossier (un seul parcours os.scandir), mis en cache par mtime.
+    Le mtime ne reflète que les entrées directes du dossier : le TTL borne l'obsolescence
+    pour les modifications dans les sous-dossiers.
+    """
+    return list(DocumentIngestionComponent._iter_documents(Path(dir_str)))
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _pdf_tree_text(dir_str: str, mtime_ns: int) -> str:
+    """Aperçu texte de l'arborescence des PDF d'un dossier, groupés par sous-dossier"""
+    files_by_dir: Dict[str, List[str]] = {}
+    for path in _list_docs_in_dir(dir_str, mtime_ns):
+        if path.suffix.lower() == ".pdf":
+            # Chemins relatifs calculés sur des chaînes, sans Path.relative_to
+            parent, name = os.path.split(os.fspath(path))
+            files_by_dir.setdefault(os.path.relpath(parent, dir_str), []).append(name)
+    lines = []
+    for dir_path, files in sorted(files_by_dir.items()):
+        lines.append("📁 /" if dir_path == "." else f"📁 {dir_path}")
+        lines.extend(f"    📄 {file}" for file in sorted(files))
+    return "\n".join(lines)
+
+
+_INGESTION_CSS = """
+    <style>
+    .upload-status {
+        margin: 10px 0;
+        padding: 10px;
+        border-radius: 5px;
+    }
+    .status-processing {
+        background-color: #f0f2f6;
+        border-left: 5px solid #3498db;
+    }
+    .status-success {
+        background-color: #eafaf1;
+        border-left: 5px solid #2ecc71;
+    }
+    .status-error {
+        background-color: #fdedec;
+        border-left: 5px solid #e74c3c;
+    }
+    .status-skipped {
+        background-color: #fef9e7;
+        border-left: 5px solid #f1c40f;
+    }
+    .config-section {
+        background-color: #f8f9fa;
+        padding: 15px;
+        border-radius: 8px;
+        margin: 10px 0;
+    }
+    .file-info {
+        font-size: 0.9em;
+        color: #666;
+    }
+    .progress-bar {
+        display: block;
+        width: 100%;
+        height: 5px;
+        margin: 5px 0;
+    }
+    </style>
+"""
+
+@st.cache_resource
+def _inject_ingestion_styles():
+    """Injecte les styles CSS ; l'élément est rejoué par le cache à chaque rerun"""
+    st.markdown(_INGESTION_CSS, unsafe_allow_html=True)
 
 class DocumentIngestionComponent:
     """Composant optimisé pour l'ingestion de documents"""
@@ -21,41 +234,7 @@ class DocumentIngestionComponent:
         
     def _init_styles(self):
         """Initialise les styles CSS pour une meilleure UX"""
-        st.markdown("""
-            <style>
-            .upload-status {
-                margin: 10px 0;
-                padding: 10px;
-                border-radius: 5px;
-            }
-            .status-processing {
-                background-color: #f0f2f6;
-                border-left: 5px solid #3498db;
-            }
-            .status-success {
-                background-color: #eafaf1;
-                border-left: 5px solid #2ecc71;
-            }
-            .status-error {
-                background-color: #fdedec;
-                border-left: 5px solid #e74c3c;
-            }
-            .config-section {
-                background-color: #f8f9fa;
-                padding: 15px;
-                border-radius: 8px;
-                margin: 10px 0;
-            }
-            .file-info {
-                font-size: 0.9em;
-                color: #666;
-            }
-            .progress-bar {
-                height: 5px;
-                margin: 5px 0;
-            }
-            </style>
-        """, unsafe_allow_html=True)
+        _inject_ingestion_styles()
     
     def _init_session_state(self):
         """Initialise ou récupère les états de session avec des valeurs par défaut optimisées"""
@@ -69,6 +248,7 @@ class DocumentIngestionComponent:
             'vlm_model': 'gemini-1.5-flash-002',
             'exclude_elements': ['Header', 'Footer'],
             'custom_elements': False,
+            'n_workers': max(1, (os.cpu_count() or 2) - 1),
             'last_update': time.time()
         }
         
@@ -77,27 +257,24 @@ class DocumentIngestionComponent:
         elif 'last_update' not in st.session_state.ingestion_config:
             st.session_state.ingestion_config.update(default_config)
             
-        # État pour le cache et la progression
-        if 'kb_cache_timestamp' not in st.session_state:
-            st.session_state.kb_cache_timestamp = time.time()
-        if 'upload_progress' not in st.session_state:
-            st.session_state.upload_progress = {}
+        # État pour la progression
+        upload_progress = st.session_state.get('upload_progress')
+        defaults = {}
+        if not isinstance(upload_progress, OrderedDict):
+            defaults['upload_progress'] = OrderedDict(upload_progress or {})
         if 'upload_stats' not in st.session_state:
-            st.session_state.upload_stats = {'success': 0, 'error': 0, 'total': 0}
-
-    @lru_cache(maxsize=32)
-    def _get_cached_kb_list(self, cache_timestamp: float) -> List[Dict]:
-        """Récupère et met en cache la liste des bases de connaissances"""
-        return self.kb_manager.list_knowledge_bases()
+            defaults['upload_stats'] = {'success': 0, 'error': 0, 'total': 0}
+        if defaults:
+            st.session_state.update(defaults)
 
     def _validate_file(self, file_name: str, file_size: int, use_vlm: bool) -> Tuple[bool, str]:
         """Validation optimisée des fichiers avec vérifications rapides"""
         # Vérification rapide de l'extension
-        ext = Path(file_name).suffix.lower()
+        ext = os.path.splitext(file_name)[1].lower()
         if use_vlm:
-            if ext != '.pdf':
+            if ext not in _VLM_EXTS:
                 return False, "Le traitement VLM n'est disponible que pour les fichiers PDF"
-        elif ext not in ['.pdf', '.docx', '.txt', '.md']:
+        elif ext not in _ALLOWED_EXTS:
             return False, f"Extension non supportée: {ext}"
         
         # Vérification de la taille avec limite configurable
@@ -107,90 +284,105 @@ class DocumentIngestionComponent:
             
         return True, ""
 
-    def _update_progress(self, key: str, status: str, message: str, progress: float = 0):
-        """Met à jour la progression de manière atomique"""
-        st.session_state.upload_progress[key] = {
-            'status': status,
-            'message': message,
-            'progress': progress,
-            'timestamp': time.time()
-        }
+    @staticmethod
+    def _get_file_size(file) -> int:
+        """Taille du fichier sans copier son contenu lorsque c'est possible"""
+        size = getattr(file, 'size', None)
+        if size is not None:
+            return size
+        if hasattr(file, 'getbuffer'):
+            # memoryview sur le tampon : pas de copie du contenu
+            with file.getbuffer() as buffer:
+                return buffer.nbytes
+        return len(file.getvalue())
+
+    @staticmethod
+    def _copy_to_file(file, dst, size_hint: int = 0) -> int:
+        """
+        Copie le contenu de `file` dans `dst` sans matérialiser tout le fichier en mémoire :
+        os.sendfile (copie noyau) si la source a un vrai descripteur, sinon blocs de 1 MiB.
+        Lorsque la taille est connue (`size_hint`), l'espace disque est réservé d'avance.
+        
+        Returns:
+            int: Nombre d'octets écrits
+        """
+        if size_hint > 0 and hasattr(os, 'posix_fallocate'):
+            try:
+                os.posix_fallocate(dst.fileno(), 0, size_hint)
+            except OSError:
+                size_hint = 0  # Non pris en charge par le système de fichiers : simple indication
 
-    async def _process_file(
-        self, 
-        file,
-        kb_id: str,
-        config: Dict[str, Any],
-        progress_key: str
-    ) -> Tuple[bool, str]:
-        """Traitement asynchrone optimisé des fichiers"""
         try:
-            self._update_progress(progress_key, 'processing', 'Validation du fichier...', 0.1)
-            
-            # Validation rapide
-            is_valid, error = self._validate_file(
-                file.name,
-                len(file.getvalue()),
-                config.get('file_parsing_config', {}).get('use_vlm', False)
-            )
-            if not is_valid:
-                self._update_progress(progress_key, 'error', error)
-                return False, error
-
-            # Création du fichier temporaire avec contexte
-            with tempfile.NamedTemporaryFile(delete=False, suffix=Path(file.name).suffix) as tmp_file:
-                self._update_progress(progress_key, 'processing', 'Préparation du fichier...', 0.2)
-                tmp_file.write(file.getvalue())
-                tmp_file.flush()
-                
-                try:
-
-                    # Enrichissement des métadonnées
-                    metadata = config.pop('metadata', {})
-                    metadata.update({
-                        'original_filename': file.name,
-                        'file_size': len(file.getvalue()),
-                        'file_type': Path(file.name).suffix.lower()[1:],
-                        'upload_timestamp': datetime.now().isoformat(),
-                        'processing_config': {
-                            'use_vlm': config.get('file_parsing_config', {}).get('use_vlm', False),
-                            'chunk_size': config.get('chunk_size'),
-                            'semantic_sectioning': config.get('semantic_sectioning_config', {}).get('use_semantic_sectioning')
-                        }
-                    })
-
-                    self._update_progress(progress_key, 'processing', 'Ingestion en cours...', 0.4)
-                    
-                    # Traitement asynchrone via executor
-                    success = await asyncio.get_event_loop().run_in_executor(
-                        None,
-                        lambda: self.kb_manager.add_document(
-                            kb_id=kb_id,
-                            file_path=tmp_file.name,
-                            doc_id=file.name,
-                            metadata=metadata,
-                            **config
-                        )
-                    )
-                    
-                    if success:
-                        self._update_progress(progress_key, 'success', 'Document ajouté avec succès', 1.0)
-                        return True, ""
-                    else:
-                        self._update_progress(progress_key, 'error', "Échec de l'ingestion")
-                        return False, "Échec de l'ingestion"
-                        
-                finally:
-                    # Nettoyage asynchrone du fichier temporaire
-                    await asyncio.get_event_loop().run_in_executor(
-                        None,
-                        lambda: Path(tmp_file.name).unlink(missing_ok=True)
-                    )
-                    
-        except Exception as e:
-            error_msg = f"Erreur inattendue: {str(e)}"
-            self._update_progress(progress_key, 'error', error_msg)
-            return False, error_msg
+            src_fd = file.fileno()
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            src_fd = None
+
+        if src_fd is not None and hasattr(os, 'sendfile'):
+            dst.flush()
+            size = os.fstat(src_fd).st_size
+            offset = 0
+            while offset < size:
+                sent = os.sendfile(dst.fileno(), src_fd, offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+            dst.seek(offset)
+            written = offset
+        elif not hasattr(file, 'seek'):
+            # Objet minimal sans flux (read() sans taille) : écriture directe
+            dst.write(file.getvalue())
+            written = dst.tell()
+        else:
+            file.seek(0)
+            shutil.copyfileobj(file, dst, length=1 << 20)
+            written = dst.tell()
+
+        if size_hint > written:
+            # Taille annoncée supérieure au contenu réel : retirer l'espace réservé en trop
+            dst.truncate(written)
+        return written
+
+    def _new_progress_key(self, file_name: str) -> int:
+        """Enregistre l'entrée de progression d'un fichier et retourne son identifiant entier"""
+        key = next(_PROGRESS_IDS)
+        self._update_progress(key, 'processing', 'En attente...', 0.0, file_name=file_name)
+        return key
+
+    def _update_progress(
+        self,
+        key: int,
+        status: str,
+        message: str,
+        progress: float = 0,
+        file_name: Optional[str] = None
+    ):
+        """Met à jour la progression de manière atomique (LRU borné, entrées expirées purgées)"""
+        now = time.time()
+        upload_progress = st.session_state.upload_progress
+        with _PROGRESS_LOCK:
+            entry = upload_progress.get(key)
+            if entry is None:
+                # Les clés croissantes (_PROGRESS_IDS) donnent l'ordre de création
+                upload_progress[key] = {
+                    'file_name': file_name or str(key),
+                    'status': status,
+                    'message': message,
+                    'progress': progress,
+                    'updated': now
+                }
+            else:
+                # Mise à jour en place des champs, sans recréer l'entrée
+                entry['status'] = status
+                entry['message'] = message
+                entry['progress'] = progress
+                entry['updated'] = now
+                upload_progress.move_to_end(key)
+            # Les entrées les moins récemment mises à jour sont en tête
+            while upload_progress and (
+                len(upload_progress) > _PROGRESS_MAX_ENTRIES
+                or now - next(iter(upload_progress.values())).get('updated', 0) > _PROGRESS_TTL
+            ):
+                upload_progress.popitem(last=False)
 
     def _render_progress(self):
         """Affiche la progression avec une interface améliorée"""
@@ -199,87 +391,147 @@ class DocumentIngestionComponent:
             
         st.markdown("### 📊 Progression des uploads")
         
-        for key, progress in dict(sorted(
-            st.session_state.upload_progress.items(),
-            key=lambda x: x[1].get('timestamp', 0),
-            reverse=True
-        )).items():
-            file_name = key.split('_')[0]
+        # Instantané : les threads d'ingestion peuvent modifier le dict pendant l'affichage
+        with _PROGRESS_LOCK:
+            # Plus récents d'abord : tri direct sur les identifiants entiers
+            entries = [
+                (key, st.session_state.upload_progress[key])
+                for key in sorted(st.session_state.upload_progress, reverse=True)
+            ]
+        
+        # Tout le panneau est émis en un seul st.markdown (barre de progression HTML incluse)
+        html_parts = []
+        for key, progress in entries:
+            file_name = progress.get('file_name', key)
             status = progress['status']
             message = progress.get('message', '')
+            progress_html = (
+                f'<progress class="progress-bar" value="{progress.get("progress", 0)}" max="1"></progress>'
+                if status == 'processing' else ""
+            )
             
             # Utilisation de classes CSS personnalisées
-            status_class = f"status-{status}"
-            with st.container():
-                st.markdown(
-                    f"""<div class="upload-status {status_class}">
-                        <div class="file-info">{file_name}</div>
-                        {message}
-                    </div>""",
-                    unsafe_allow_html=True
-                )
-                
-                if status == 'processing':
-                    st.progress(progress.get('progress', 0), text=None)
+            html_parts.append(
+                f'<div class="upload-status status-{status}">'
+                f'<div class="file-info">{file_name}</div>'
+                f'{message}{progress_html}'
+                f'</div>'
+            )
+        
+        st.markdown("".join(html_parts), unsafe_allow_html=True)
+
+    def _render_results(self, results: List[Tuple[str, str, str]], total: int):
+        """Affiche le bilan d'une ingestion : un message global et un seul tableau récapitulatif"""
+        counts = Counter(status for _, status, _ in results)
+        added, skipped = counts[_ADDED], counts[_SKIPPED]
+        if added:
+            # Invalide les listes de bases/documents mises en cache par les autres onglets
+            invalidate_kb_caches()
+        skipped_text = f", {skipped} ignorés (déjà présents)" if skipped else ""
+        if counts[_FAILED] == 0:
+            st.success(f"✅ {added} documents ajoutés avec succès{skipped_text}!")
+        else:
+            st.warning(
+                f"⚠️ {added}/{total} documents ajoutés{skipped_text}, {counts[_FAILED]} en échec. "
+                "Consultez le tableau ci-dessous pour plus de détails."
+            )
+        st.dataframe(
+            pd.DataFrame(results, columns=["Fichier", "Statut", "Message"]),
+            use_container_width=True,
+            hide_index=True
+        )
 
     def _render_config_section(self) -> Dict[str, Any]:
         """Affiche la section de configuration avec une interface optimisée"""
         config = st.session_state.ingestion_config
         
-        # Section de configuration de base
-        with st.expander("⚙️ Configuration d'ingestion", expanded=False):
-            st.markdown("### 📝 Paramètres de base")
-            col1, col2 = st.columns(2)
+        # Formulaire pour les valeurs simples : les changements ne déclenchent pas de rerun ;
+        # les valeurs renvoyées par les widgets sont celles du dernier « Appliquer »
+        with st.form("ingest_config", clear_on_submit=False):
+            # Section de configuration de base
+            with st.expander("⚙️ Configuration d'ingestion", expanded=False):
+                st.markdown("### 📝 Paramètres de base")
+                col1, col2 = st.columns(2)
             
-            with col1:
-                config['auto_context'] = st.toggle(
-                    "👁️ Auto-contexte",
-                    value=config['auto_context'],
-                    help="Génération automatique du contexte et des résumés"
+                with col1:
+                    config['auto_context'] = st.toggle(
+                        "👁️ Auto-contexte",
+                        value=config['auto_context'],
+                        help="Génération automatique du contexte et des résumés"
+                    )
+                    config['semantic_sectioning'] = st.toggle(
+                        "🔍 Sectionnement sémantique",
+                        value=config['semantic_sectioning'],
+                        help="Découpage intelligent du document en sections"
+                    )
+                
+                with col2:
+                    config['chunk_size'] = st.slider(
+                        "📏 Taille des chunks",
+                        400, 2000, config['chunk_size'],
+                        help="Taille des segments de texte"
+                    )
+                    config['min_length'] = st.slider(
+                        "📐 Longueur minimale",
+                        800, 3000, config['min_length'],
+                        help="Longueur minimale avant découpage"
+                    )
+                    config['n_workers'] = st.slider(
+                        "⚡ Nombre de workers",
+                        1, 16, config.get('n_workers', max(1, (os.cpu_count() or 2) - 1)),
+                        help="Fichiers préparés en parallèle (copie, empreinte) ; l'écriture dans la base reste séquentielle"
+                    )
+
+            # Métadonnées
+            with st.expander("📋 Métadonnées", expanded=False):
+                metadata = {}
+                metadata["document_type"] = st.selectbox(
+                    "Type de document",
+                    _DOC_TYPES
                 )
-                config['semantic_sectioning'] = st.toggle(
-                    "🔍 Sectionnement sémantique",
-                    value=config['semantic_sectioning'],
-                    help="Découpage intelligent du document en sections"
+            
+                metadata["tags"] = st.text_input(
+                    "Tags (séparés par des virgules)",
+                    help="Ex: technique, maintenance, sécurité"
                 )
+            
+                if metadata["tags"]:
+                    metadata["tags"] = [tag.strip() for tag in metadata["tags"].split(",")]
                 
-            with col2:
-                config['chunk_size'] = st.slider(
-                    "📏 Taille des chunks",
-                    400, 2000, config['chunk_size'],
-                    help="Taille des segments de texte"
-                )
-                config['min_length'] = st.slider(
-                    "📐 Longueur minimale",
-                    800, 3000, config['min_length'],
-                    help="Longueur minimale avant découpage"
+                metadata["description"] = st.text_area(
+                    "Description",
+                    help="Description courte du document"
                 )
+            
+                metadata["added_by"] = st.text_input("Ajouté par")
 
-            # Configuration VLM
-            st.markdown("### 🔬 Configuration VLM")
+            st.form_submit_button(
+                "Appliquer",
+                help="Applique les paramètres de base et les métadonnées"
+            )
+
+        # Hors formulaire : les options VLM affichent ou masquent immédiatement leurs
+        # réglages dépendants (provider, modèle, projet GCP, éléments personnalisés)
+        with st.expander("🔬 Configuration VLM", expanded=False):
             config['use_vlm'] = st.toggle(
                 "Utiliser l'analyse visuelle (VLM)",
                 value=config['use_vlm'],
                 help="Active l'analyse des PDF via vision-langage"
             )
-            
+
             if config['use_vlm']:
                 vlm_col1, vlm_col2 = st.columns(2)
                 with vlm_col1:
                     config['vlm_provider'] = st.selectbox(
                         "Provider VLM",
-                        options=["gemini", "vertex_ai"],
-                        index=0 if config['vlm_provider'] == "gemini" else 1
+                        options=_VLM_PROVIDERS,
+                        index=_VLM_PROVIDERS.index(config['vlm_provider'])
                     )
 
                 with vlm_col2:
-                    models = {
-                        "gemini": ["gemini-1.5-flash-002"],
-                        "vertex_ai": ["vertex-ai-vision-model"]
-                    }
                     config['vlm_model'] = st.selectbox(
                         "Modèle VLM",
-                        options=models[config['vlm_provider']]
+                        options=_VLM_MODELS[config['vlm_provider']]
                     )
 
                 if config['vlm_provider'] == "vertex_ai":
@@ -290,7 +542,7 @@ class DocumentIngestionComponent:
                 st.markdown("#### 🎯 Configuration des éléments")
                 config['exclude_elements'] = st.multiselect(
                     "Éléments à exclure",
-                    options=["Header", "Footer", "Equation", "Table"],
+                    options=_EXCLUDE_OPTIONS,
                     default=config['exclude_elements']
                 )
 
@@ -298,280 +550,290 @@ class DocumentIngestionComponent:
                     "Elements personnalisés",
                     value=config['custom_elements']
                 )
-                
+
                 if config['custom_elements']:
+                    # Import différé : seulement utile lorsque les éléments personnalisés sont activés
+                    from dsrag.dsparse.file_parsing.element_types import default_element_types
                     config['element_types'] = default_element_types
                 else:
                     config['element_types'] = []
 
-        # Métadonnées
-        with st.expander("📋 Métadonnées", expanded=False):
-            metadata = {}
-            metadata["document_type"] = st.selectbox(
-                "Type de document",
-                ["rapport", "specification", "procedure", "documentation", "autre"]
-            )
-            
-            metadata["tags"] = st.text_input(
-                "Tags (séparés par des virgules)",
-                help="Ex: technique, maintenance, sécurité"
-            )
-            
-            if metadata["tags"]:
-                metadata["tags"] = [tag.strip() for tag in metadata["tags"].split(",")]
-                
-            metadata["description"] = st.text_area(
-                "Description",
-                help="Description courte du document"
+        # Configuration finale : reconstruite uniquement lorsqu'une valeur change
+        return _build_processing_config(
+            config['auto_context'],
+            config['semantic_sectioning'],
+            config['chunk_size'],
+            config['min_length'],
+            config['use_vlm'],
+            config['vlm_provider'],
+            config['vlm_model'],
+            config.get('project_id', ''),
+            config.get('location', ''),
+            tuple(config['exclude_elements']),
+            config['custom_elements'],
+            tuple(
+                (key, tuple(value) if isinstance(value, list) else value)
+                for key, value in metadata.items()
             )
-            
-            metadata["added_by"] = st.text_input("Ajouté par")
-
-        # Construction de la configuration finale
-        processing_config = {
-            "auto_context_config": {
-                "use_generated_title": False,
-                "get_document_summary": config['auto_context'],
-                "get_section_summaries": config['auto_context'] and config['semantic_sectioning']
-            },
-            "semantic_sectioning_config": {
-                "use_semantic_sectioning": config['semantic_sectioning']
-            },
-            "chunk_size": config['chunk_size'],
-            "min_length_for_chunking": config['min_length'],
-            "metadata": metadata
-        }
-
-        if config['use_vlm']:
-            vlm_config = {
-                "provider": config['vlm_provider'],
-                "model": config['vlm_model'],
-                "exclude_elements": config['exclude_elements'],
-                "element_types": config['element_types']
-            }
-            
-            if config['vlm_provider'] == "vertex_ai":
-                vlm_config.update({
-                    "project_id": config.get('project_id', ''),
-                    "location": config.get('location', '')
-                })
-
-            processing_config.update({
-                "use_vlm": True,
-                "vlm_config": vlm_config,
-                "exclude_elements": config['exclude_elements'],
-                "element_types": config['element_types']
-            })
-
-        return processing_config
+        )
 
-    def _process_file_sync(
-        self, 
-        file,
+    def _prepare_doc(
+        self,
+        file_path: str,
+        name: str,
         kb_id: str,
-        config: Dict[str, Any],
-        progress_key: str
-    ) -> Tuple[bool, str]:
-        """Version synchrone du traitement des fichiers"""
-        try:
-            self._update_progress(progress_key, 'processing', 'Validation du fichier...', 0.1)
-            
-            is_valid, error = self._validate_file(
-                file.name,
-                len(file.getvalue()),
-                config.get('file_parsing_config', {}).get('use_vlm', False)
-            )
-            if not is_valid:
-                self._update_progress(progress_key, 'error', error)
-                return False, error
-
-            with tempfile.NamedTemporaryFile(delete=False, suffix=Path(file.name).suffix) as tmp_file:
-                self._update_progress(progress_key, 'processing', 'Préparation du fichier...', 0.2)
-                tmp_file.write(file.getvalue())
-                tmp_file.flush()
-                
-                try:
-                    metadata = config.pop('metadata', {})
-                    metadata.update({
-                        'original_filename': file.name,
-                        'file_size': len(file.getvalue()),
-                        'file_type': Path(file.name).suffix.lower()[1:],
-                        'upload_timestamp': datetime.now().isoformat()
-                    })
-
-                    self._update_progress(progress_key, 'processing', 'Ingestion en cours...', 0.4)
-                    
-                    success = self.kb_manager.add_document(
-                        kb_id=kb_id,
-                        file_path=tmp_file.name,
-                        doc_id=file.name,
-                        metadata=metadata,
-                        chunk_size=config.get('chunk_size'),
-                        min_length_for_chunking=config.get('min_length'),
-                        auto_context_config=config.get('auto_context_config'),
-                        semantic_sectioning_config=config.get('semantic_sectioning_config'),
-                    )
-                    
-                    if success:
-                        self._update_progress(progress_key, 'success', 'Document ajouté avec succès', 1.0)
-                        return True, ""
-                    else:
-                        self._update_progress(progress_key, 'error', "Échec de l'ingestion")
-                        return False, "Échec de l'ingestion"
-                        
-                finally:
-                    Path(tmp_file.name).unlink(missing_ok=True)
-                    
-        except Exception as e:
-            error_msg = f"Erreur inattendue: {str(e)}"
-            self._update_progress(progress_key, 'error', error_msg)
-            return False, error_msg
-
-    def _process_folder_recursive(self, folder_path: str, kb_id: str, config: dict, allowed_extensions: List[str]) -> Tuple[int, int]:
+        config: Mapping[str, Any],
+        batch_hashes: Dict[str, str]
+    ) -> Tuple[Optional[Dict[str, Any]], str]:
         """
-        Traite récursivement un dossier pour ingérer tous les PDFs.
+        Arguments de add_documents pour un fichier présent sur disque (doc_id, métadonnées,
+        configuration de découpage). Le fichier est écarté si un document au contenu identique
+        est déjà dans la base ou dans le lot en cours : il n'est alors ni reparsé ni réindexé.
         
         Args:
-            folder_path: Chemin du dossier à traiter
-            kb_id: ID de la base de connaissances
-            config: Configuration d'ingestion
-            allowed_extensions: Extensions de fichiers autorisées
-        
+            file_path: Chemin du fichier à ingérer
+            name: Nom d'origine du fichier (doc_id avant normalisation)
+            batch_hashes: Empreintes {empreinte: nom} des fichiers retenus dans le lot, complété ici
+            
         Returns:
-            Tuple[int, int]: (nombre de fichiers traités avec succès, nombre total de fichiers)
+            Tuple[Optional[Dict], str]: (arguments de add_documents, "") ou (None, motif de l'écart)
         """
-        success_count = 0
-        total_files = 0
+        content_hash = KnowledgeBaseManager.content_hash(file_path)
+        existing = self.kb_manager.find_document_by_hash(kb_id, content_hash)
+        if existing:
+            return None, f"Déjà présent dans la base ({existing})"
+        # L'index de la base ne connaît les fichiers du lot qu'après add_documents
+        if content_hash in batch_hashes:
+            return None, f"Doublon de {batch_hashes[content_hash]} dans ce lot"
+        batch_hashes[content_hash] = name
         
-        for root, _, files in os.walk(folder_path):
-            for filename in files:
-                if any(filename.lower().endswith(ext) for ext in allowed_extensions):
-                    total_files += 1
-                    file_path = os.path.join(root, filename)
-                    
-                    # Créer une clé unique pour suivre la progression
-                    progress_key = f"{filename}_{time.time()}"
-                    
-                    try:
-                        # Lecture du fichier
-                        with open(file_path, 'rb') as file:
-                            file_content = file.read()
-                            
-                        # Créer un objet temporaire similaire à UploadedFile de Streamlit
-                        class TempUploadFile:
-                            def __init__(self, name, content):
-                                self.name = name
-                                self._content = content
-                            def read(self):
-                                return self._content
-                            def getvalue(self):
-                                return self._content
-                        
-                        temp_file = TempUploadFile(filename, file_content)
-                        
-                        # Utiliser le chemin relatif comme doc_id pour préserver la structure
-                        rel_path = os.path.relpath(file_path, folder_path)
-                        config['metadata'] = config.get('metadata', {})
-                        config['metadata'].update({
-                            'original_path': rel_path,
-                            'folder_structure': True
-                        })
-                        
-                        # Traiter le fichier
-                        success, _ = self._process_file_sync(
-                            file=temp_file,
-                            kb_id=kb_id,
-                            config=config,
-                            progress_key=progress_key
-                        )
-                        
-                        if success:
-                            success_count += 1
-                            
-                    except Exception as e:
-                        self._update_progress(
-                            progress_key,
-                            'error',
-                            f"Erreur lors du traitement de {filename}: {str(e)}"
-                        )
-                        continue
-                    
-        return success_count, total_files
+        return {
+            'file_path': file_path,
+            'doc_id': name,
+            # Nouveau dict : la configuration est commune à tous les fichiers de l'ingestion
+            'metadata': {
+                **config.get('metadata', {}),
+                'original_filename': name,
+                'file_size': os.path.getsize(file_path),
+                'file_type': os.path.splitext(name)[1].lower()[1:],
+                'upload_timestamp': datetime.now().isoformat(),
+                'content_hash': content_hash
+            },
+            'chunk_size': config.get('chunk_size'),
+            'min_length_for_chunking': config.get('min_length_for_chunking'),
+            'auto_context_config': config.get('auto_context_config'),
+            'semantic_sectioning_config': config.get('semantic_sectioning_config'),
+        }, ""
 
-    def _process_uploaded_directory(
+    def _process_upload_batch(
         self,
-        files: List[Any],  # Modification ici pour accepter les fichiers uploadés
+        items: List[Tuple[Any, int]],
         kb_id: str,
-        config: Dict
-    ) -> Tuple[int, int]:
+        config: Mapping[str, Any]
+    ) -> List[Tuple[str, str, str]]:
         """
-        Traite un ensemble de fichiers uploadés représentant un dossier.
+        Ingère un lot de fichiers uploadés (exécuté dans un thread du pool) : chaque fichier
+        est copié dans un fichier temporaire, puis un seul appel add_documents charge la base
+        une fois pour tout le lot.
         
         Args:
-            files: Liste des fichiers uploadés via Streamlit
-            kb_id: ID de la base de connaissances
-            config: Configuration d'ingestion
+            items: Couples (fichier uploadé, clé de progression)
             
         Returns:
-            Tuple[int, int]: (nombre de succès, nombre total)
+            List[Tuple[str, str, str]]: (fichier, statut, message) pour chaque fichier
         """
-        success_count = 0
-        total_files = 0
+        results: List[Tuple[str, str, str]] = []
+        pending: List[Tuple[str, int]] = []
+        docs: List[Dict[str, Any]] = []
+        tmp_paths: List[str] = []
+        # Empreintes des fichiers retenus dans ce lot (voir _prepare_doc)
+        batch_hashes: Dict[str, str] = {}
+        use_vlm = config.get('use_vlm', False)
         
-        # Organiser les fichiers par structure de dossier
-        file_structure = {}
-        for uploaded_file in files:
-            # Nettoyer le chemin et créer la structure
-            clean_path = uploaded_file.name.replace('\\', '/').lstrip('/')
-            parts = clean_path.split('/')
-            
-            # Vérifier l'extension
-            if not any(clean_path.lower().endswith(ext) for ext in 
-                      ([".pdf"] if config.get("use_vlm", False) else [".pdf", ".docx", ".txt", ".md"])):
-                continue
-                
-            file_structure[clean_path] = uploaded_file
-            total_files += 1
-
-        # Traiter chaque fichier
-        with st.progress(0) as progress_bar:
-            for idx, (file_path, file) in enumerate(file_structure.items()):
+        try:
+            for file, progress_key in items:
                 try:
-                    # Mise à jour des métadonnées avec le chemin
-                    current_config = config.copy()
-                    current_config['metadata'] = current_config.get('metadata', {})
-                    current_config['metadata'].update({
-                        'original_path': file_path,
-                        'folder_structure': True,
-                        'directory_upload': True
-                    })
-                    
-                    # Clé unique pour le suivi
-                    progress_key = f"{file_path}_{time.time()}"
-                    
-                    # Traiter le fichier
-                    success, _ = self._process_file_sync(
-                        file=file,
-                        kb_id=kb_id,
-                        config=current_config,
-                        progress_key=progress_key
-                    )
+                    self._update_progress(progress_key, 'processing', 'Validation du fichier...', 0.1)
+                    file_size = self._get_file_size(file)
+                    is_valid, error = self._validate_file(file.name, file_size, use_vlm)
+                    if not is_valid:
+                        self._update_progress(progress_key, 'error', error)
+                        results.append((file.name, _FAILED, error))
+                        continue
                     
-                    if success:
-                        success_count += 1
-                        
-                    # Mise à jour de la barre de progression
-                    progress_bar.progress((idx + 1) / total_files)
+                    self._update_progress(progress_key, 'processing', 'Préparation du fichier...', 0.2)
+                    # Le fichier temporaire garde l'extension (détection du format par dsRAG)
+                    suffix = os.path.splitext(file.name)[1]
+                    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix, buffering=1 << 20) as tmp_file:
+                        tmp_paths.append(tmp_file.name)
+                        self._copy_to_file(file, tmp_file, file_size)
                     
+                    doc, skipped = self._prepare_doc(tmp_file.name, file.name, kb_id, config, batch_hashes)
+                    if doc is None:
+                        self._update_progress(progress_key, 'skipped', skipped, 1.0)
+                        results.append((file.name, _SKIPPED, skipped))
+                        continue
+                    docs.append(doc)
+                    pending.append((file.name, progress_key))
                 except Exception as e:
-                    self._update_progress(
-                        progress_key,
-                        'error',
-                        f"Erreur lors du traitement de {file_path}: {str(e)}"
-                    )
-                    continue
+                    error_msg = f"Erreur inattendue: {str(e)}"
+                    self._update_progress(progress_key, 'error', error_msg)
+                    results.append((file.name, _FAILED, error_msg))
+            
+            if docs:
+                for _, progress_key in pending:
+                    self._update_progress(progress_key, 'processing', 'Ingestion en cours...', 0.4)
+                try:
+                    flags = self.kb_manager.add_documents(kb_id, docs)
+                    errors = ["" if success else "Échec de l'ingestion" for success in flags]
+                except Exception as e:
+                    flags = [False] * len(docs)
+                    errors = [f"Erreur inattendue: {str(e)}"] * len(docs)
                 
-        return success_count, total_files
+                for (name, progress_key), success, error in zip(pending, flags, errors):
+                    if success:
+                        self._update_progress(progress_key, 'success', 'Document ajouté avec succès', 1.0)
+                    else:
+                        self._update_progress(progress_key, 'error', error)
+                    results.append((name, _ADDED if success else _FAILED, error))
+        finally:
+            for tmp_path in tmp_paths:
+                Path(tmp_path).unlink(missing_ok=True)
+        
+        return results
+
+    @staticmethod
+    def _iter_documents(
+        folder: Path,
+        extensions: set = _ALLOWED_EXTS,
+        recursive: bool = True
+    ) -> Iterator[Path]:
+        """
+        Parcourt un dossier (os.scandir) et produit au fil de l'eau les fichiers
+        dont l'extension appartient à `extensions`. Les dossiers cachés sont ignorés ;
+        les liens symboliques sont suivis, chaque dossier réel n'étant visité qu'une fois.
+        """
+        root = os.fspath(folder)
+        pending = [root]
+        try:
+            root_stat = os.stat(root)
+            visited = {(root_stat.st_dev, root_stat.st_ino)}
+        except OSError:
+            return
+        while pending:
+            current = pending.pop()
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        try:
+                            is_dir = entry.is_dir()
+                        except OSError:
+                            continue
+                        if is_dir:
+                            if recursive and not entry.name.startswith('.'):
+                                # Protection contre les cycles créés par des liens symboliques
+                                st_info = entry.stat()
+                                key = (st_info.st_dev, st_info.st_ino)
+                                if key not in visited:
+                                    visited.add(key)
+                                    pending.append(entry.path)
+                        elif os.path.splitext(entry.name)[1].lower() in extensions:
+                            yield Path(entry.path)
+            except OSError:
+                continue
+
+    @staticmethod
+    def _map_bounded(
+        pool: ThreadPoolExecutor,
+        fn: Callable[[Any], Any],
+        items: Iterable[Any],
+        max_in_flight: int = 32
+    ) -> Iterator[Any]:
+        """
+        Soumet fn(item) au pool en consommant `items` paresseusement, avec au plus
+        `max_in_flight` tâches en attente. Produit les résultats dans l'ordre de fin.
+        """
+        in_flight = set()
+        for item in items:
+            if len(in_flight) >= max_in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+            in_flight.add(pool.submit(fn, item))
+        for future in as_completed(in_flight):
+            yield future.result()
+
+    @staticmethod
+    def _batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+        """Regroupe paresseusement `items` en listes d'au plus `size` éléments"""
+        iterator = iter(items)
+        while batch := list(itertools.islice(iterator, size)):
+            yield batch
+
+    @staticmethod
+    def _list_subdirectories(folder: Path) -> List[Path]:
+        """Liste récursivement les sous-dossiers (hors dossiers cachés)"""
+        directories = []
+        for root, dirs, _ in os.walk(folder):
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+            directories.extend(Path(root) / d for d in dirs)
+        return directories
+
+    def _ingest_folder_batch(
+        self,
+        file_paths: List[Path],
+        selected_path: Path,
+        kb_id: str,
+        config: Dict[str, Any]
+    ) -> List[Tuple[str, str, str]]:
+        """
+        Ingère un lot de fichiers du dossier sélectionné en un seul appel add_documents
+        (la base n'est chargée qu'une fois par lot ; exécuté dans un thread du pool).
+        
+        Returns:
+            List[Tuple[str, str, str]]: (fichier, statut, message) pour chaque fichier
+        """
+        results = []
+        labels, docs = [], []
+        # Doublons internes au lot (voir _prepare_doc)
+        batch_hashes: Dict[str, str] = {}
+        for file_path in file_paths:
+            label = str(file_path.relative_to(selected_path))
+            try:
+                if file_path.stat().st_size == 0:
+                    results.append((label, _FAILED, "Fichier vide ignoré"))
+                    continue
+                doc, skipped = self._prepare_doc(str(file_path), file_path.name, kb_id, config, batch_hashes)
+            except OSError as e:
+                results.append((label, _FAILED, f"Fichier inaccessible: {e}"))
+                continue
+            if doc is None:
+                results.append((label, _SKIPPED, skipped))
+                continue
+            doc['metadata'].update({
+                'original_path': label,
+                'folder_structure': True,
+                'source_directory': selected_path.name
+            })
+            # Les dossiers ./docs sont sectionnés en français
+            doc['semantic_sectioning_config'] = {
+                **doc['semantic_sectioning_config'],
+                "llm_provider": "openai",
+                "language": "fr"
+            }
+            labels.append(label)
+            docs.append(doc)
+        
+        if docs:
+            try:
+                flags = self.kb_manager.add_documents(kb_id, docs)
+                results.extend(
+                    (label, _ADDED, "") if success else (label, _FAILED, "Échec de l'ingestion")
+                    for label, success in zip(labels, flags)
+                )
+            except Exception as e:
+                results.extend((label, _FAILED, str(e)) for label in labels)
+        return results
 
     def render(self):
         """Interface principale pour l'ingestion de documents"""
@@ -579,18 +841,16 @@ class DocumentIngestionComponent:
 
         # Configuration
         config = self._render_config_section()
-        use_vlm = config.get("file_parsing_config", {}).get("use_vlm", False)
+        use_vlm = config.get("use_vlm", False)
+        n_workers = st.session_state.ingestion_config.get('n_workers', 1)
 
         # Sélection de la base
-        kb_list = self._get_cached_kb_list(st.session_state.kb_cache_timestamp)
+        kb_list = get_kb_list(self.kb_manager)
         if not kb_list:
             st.warning("🚫 Aucune base de connaissances disponible.")
             return
 
-        kb_options = {
-            kb["id"]: f"{kb['title']} ({kb['id']})"
-            for kb in kb_list
-        }
+        kb_options = get_kb_labels(self.kb_manager)
         
         selected_kb = st.selectbox(
             "📚 Base de connaissances",
@@ -599,7 +859,7 @@ class DocumentIngestionComponent:
         )
 
         # Types de fichiers acceptés
-        accepted_types = ["pdf"] if use_vlm else ["pdf", "docx", "txt", "md"]
+        accepted_types = _VLM_UPLOAD_TYPES if use_vlm else _UPLOAD_TYPES
 
         # Tabs pour les différentes méthodes d'upload
         upload_tab, directory_tab = st.tabs(["📄 Fichiers individuels", "📁 Dossier complet"])
@@ -618,27 +878,34 @@ class DocumentIngestionComponent:
                     status_text = st.empty()
                     
                     total = len(uploaded_files)
-                    success_count = 0
+                    results: List[Tuple[str, str, str]] = []
+                    # Mises à jour de l'UI regroupées : une par ~1% de progression et par 250 ms
+                    throttle = _UiThrottle(total)
                     
-                    for idx, file in enumerate(uploaded_files):
-                        progress_key = f"{file.name}_{time.time()}"
-                        success, _ = self._process_file_sync(
-                            file=file,
-                            kb_id=selected_kb,
-                            config=config.copy(),
-                            progress_key=progress_key
+                    # Préparation parallèle par lots (copie temporaire, empreinte, doublons) ; les
+                    # ajouts passent un à un par le verrou d'écriture de la base (gestionnaire),
+                    # chargée une seule fois par lot
+                    batch_size = max(1, min(_INGEST_BATCH_SIZE, -(-total // n_workers)))
+                    process_batch = with_script_ctx(self._process_upload_batch)
+                    with ThreadPoolExecutor(max_workers=n_workers) as pool:
+                        ingested = self._map_bounded(
+                            pool,
+                            lambda batch: process_batch(batch, selected_kb, config),
+                            self._batched(
+                                ((file, self._new_progress_key(file.name)) for file in uploaded_files),
+                                batch_size
+                            )
                         )
                         
-                        if success:
-                            success_count += 1
-                        
-                        progress_bar.progress((idx + 1) / total)
-                        status_text.text(f"Traitement: {idx + 1}/{total} fichiers")
+                        for batch_results in ingested:
+                            results.extend(batch_results)
+                            done = len(results)
+                            if throttle.ready(done):
+                                progress_bar.progress(done / total)
+                                status_text.text(f"Traitement: {done}/{total} fichiers - {batch_results[-1][0]}")
                     
-                    if success_count == total:
-                        st.success(f"✅ {success_count} documents ajoutés avec succès!")
-                    else:
-                        st.warning(f"⚠️ {success_count}/{total} documents traités avec succès")
+                    status_text.empty()
+                    self._render_results(results, total)
 
         with directory_tab:
             st.write("📁 Sélectionnez un dossier contenant des documents")
@@ -650,7 +917,7 @@ class DocumentIngestionComponent:
                 return
                 
             # Récupération de l'arborescence
-            directories = [d for d in docs_path.glob("**/*") if d.is_dir()]
+            directories = self._list_subdirectories(docs_path)
             # Ajouter le dossier racine
             all_dirs = [docs_path] + directories
             # Formater les chemins pour l'affichage
@@ -667,7 +934,11 @@ class DocumentIngestionComponent:
             if selected_dir and selected_kb:
                 # Afficher la structure du dossier sélectionné
                 selected_path = Path(selected_dir)
-                pdf_files = list(selected_path.glob("**/*.pdf"))
+                # Un seul parcours du dossier, réutilisé pour l'aperçu et pour l'ingestion,
+                # mis en cache tant que le dossier n'est pas modifié (mtime, TTL 60 s)
+                dir_mtime = selected_path.stat().st_mtime_ns
+                all_documents = _list_docs_in_dir(selected_dir, dir_mtime)
+                pdf_files = [f for f in all_documents if f.suffix.lower() == ".pdf"]
                 
                 if not pdf_files:
                     st.warning("⚠️ Aucun fichier PDF trouvé dans ce dossier")
@@ -675,22 +946,8 @@ class DocumentIngestionComponent:
                     st.write(f"📊 {len(pdf_files)} fichiers PDF détectés")
                     
                     with st.expander("📂 Voir la structure détectée", expanded=False):
-                        # Organiser les fichiers par sous-dossiers
-                        files_by_dir = {}
-                        for pdf in pdf_files:
-                            rel_dir = pdf.parent.relative_to(selected_path)
-                            if rel_dir not in files_by_dir:
-                                files_by_dir[rel_dir] = []
-                            files_by_dir[rel_dir].append(pdf.name)
-                        
-                        # Afficher l'arborescence
-                        for dir_path, files in sorted(files_by_dir.items()):
-                            if dir_path == Path("."):
-                                st.text("📁 /")
-                            else:
-                                st.text(f"📁 {dir_path}")
-                            for file in sorted(files):
-                                st.text(f"    📄 {file}")
+                        # Arborescence par sous-dossier, construite une fois par état du dossier
+                        st.text(_pdf_tree_text(selected_dir, dir_mtime))
                     
                     # Options d'ingestion
                     recursive = st.checkbox(
@@ -701,105 +958,48 @@ class DocumentIngestionComponent:
                     
                     if st.button("📤 Ingérer le dossier", type="primary", key="directory_process"):
                         with st.spinner("🔄 Traitement du dossier en cours..."):
-                            # Déterminer les fichiers à traiter
-                            pattern = "**/*.pdf" if recursive else "*.pdf"
-                            files_to_process = list(selected_path.glob(pattern))
+                            # Déterminer les fichiers à traiter parmi ceux déjà collectés
+                            # Si pas de VLM, inclure aussi les autres types de fichiers
+                            extensions = _VLM_EXTS if config.get("use_vlm", False) else _ALLOWED_EXTS
                             
-                            if config.get("use_vlm", False):
-                                process_files = files_to_process
-                            else:
-                                # Si pas de VLM, inclure aussi les autres types de fichiers
-                                for ext in [".docx", ".txt", ".md"]:
-                                    files_to_process.extend(selected_path.glob(f"**/*{ext}" if recursive else f"*{ext}"))
+                            def is_selected(f: Path) -> bool:
+                                return f.suffix.lower() in extensions and (recursive or f.parent == selected_path)
                             
-                            success_count = 0
-                            total = len(files_to_process)
+                            total = sum(1 for f in all_documents if is_selected(f))
                             
                             if total == 0:
                                 st.warning("⚠️ Aucun fichier compatible trouvé dans le dossier")
                                 return
                                 
                             progress_bar = st.progress(0)
+                            status_text = st.empty()
+                            # Mises à jour de l'UI regroupées : une par ~1% de progression et par 250 ms
+                            throttle = _UiThrottle(total)
+                            results: List[Tuple[str, str, str]] = []
                             
-                            for idx, file_path in enumerate(files_to_process):
-                                try:
-                                    # Créer un identifiant relatif pour le document
-                                    rel_path = file_path.relative_to(selected_path)
-                                    doc_id = os.path.basename(str(rel_path))
-                                    
-                                    # Préparer la configuration selon la structure attendue
-                                    parsing_config = {}
-                                    if config.get("use_vlm"):
-                                        parsing_config = {
-                                            "use_vlm": True,
-                                            "vlm_config": {
-                                                "provider": config.get("vlm_provider"),
-                                                "model": config.get("vlm_model"),
-                                                "exclude_elements": config.get("exclude_elements", []),
-                                                "element_types": config.get("element_types", [])
-                                            }
-                                        }
-                                        
-                                        if config.get("vlm_provider") == "vertex_ai":
-                                            parsing_config["vlm_config"].update({
-                                                "project_id": config.get("project_id"),
-                                                "location": config.get("location")
-                                            })
-                                    # Lire la taille du fichier
-                                    file_size = file_path.stat().st_size
-                                    # Préparation des métadonnées
-                                    metadata = {
-                                        'original_path': str(rel_path),
-                                        'folder_structure': True,
-                                        'source_directory': str(selected_path.name),
-                                        'file_size': file_size,  # Ajout de la taille
-                                        'file_type': file_path.suffix.lower()[1:],  # Ajout de l'extension
-                                        'upload_timestamp': datetime.now().isoformat()
-                                    }
-                                    metadata.update(config.get('metadata', {}))
-
-                                    try:
-                                        success = self.kb_manager.add_document(
-                                            kb_id=selected_kb,
-                                            file_path=str(file_path),
-                                            doc_id=doc_id,
-                                            metadata=metadata,
-                                            auto_context_config={
-                                                "use_generated_title": False,
-                                                "get_document_summary": config.get('auto_context', True),
-                                                "get_section_summaries": config.get('auto_context', True) and config.get('semantic_sectioning', True)
-                                            },
-                                            semantic_sectioning_config={
-                                                "use_semantic_sectioning": config.get('semantic_sectioning', True),
-                                                "llm_provider": "openai",
-                                                "language": "fr"
-                                            },
-                                            chunk_size=config.get('chunk_size', 800),  # Passé directement
-                                            min_length_for_chunking=config.get('min_length', 1600)  # Passé directement
-                                        )
-                                        
-                                        if success:
-                                            success_count += 1
-                                        
-                                        # Mise à jour de la progression
-                                        progress_bar.progress((idx + 1) / total)
-                                        
-                                    except Exception as e:
-                                        st.error(f"Erreur lors du traitement de {rel_path}: {str(e)}")
-                                        continue
-
-                                except Exception as e:
-                                    st.error(f"Erreur lors du traitement du fichier {file_path.name}: {str(e)}")
-                                    continue
+                            # Préparation parallèle en flux, par lots (empreintes, doublons) ; les ajouts
+                            # dans la base sont sérialisés par le gestionnaire, qui ne la charge qu'une
+                            # fois par lot
+                            batch_size = max(1, min(_INGEST_BATCH_SIZE, -(-total // n_workers)))
+                            with ThreadPoolExecutor(max_workers=n_workers) as pool:
+                                ingested = self._map_bounded(
+                                    pool,
+                                    lambda batch: self._ingest_folder_batch(batch, selected_path, selected_kb, config),
+                                    self._batched((f for f in all_documents if is_selected(f)), batch_size)
+                                )
+                                
+                                for batch_results in ingested:
+                                    results.extend(batch_results)
+                                    # Mise à jour de la progression
+                                    done = len(results)
+                                    if throttle.ready(done):
+                                        status_text.text(f"Traitement: {batch_results[-1][0]} ({done}/{total})")
+                                        progress_bar.progress(done / total)
                             
+                            status_text.empty()
+
                             # Affichage du résultat final
-                            if success_count == total:
-                                st.success(f"✅ {success_count} documents ajoutés avec succès!")
-                            else:
-                                st.warning(
-                                    f"⚠️ {success_count}/{total} documents traités avec succès. "
-                                    "Consultez les messages d'erreur ci-dessus pour plus de détails."
-                                )
+                            self._render_results(results, total)
 
         # Affichage de la progression
         self._render_progress()
\ No newline at end of file
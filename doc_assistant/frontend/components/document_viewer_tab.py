@@ -1,9 +1,86 @@
 # doc_assistant/frontend/components/document_viewer_tab.py
 
 import streamlit as st
+from functools import lru_cache
 from typing import Dict, List, Optional, Union
 from datetime import datetime
 from backend.kb_management.manager import KnowledgeBaseManager
+from frontend.utils.resources import get_documents, get_kb_labels, get_kb_list
+
+_VIEWER_CSS = """
+    <style>
+    .doc-container {
+        border: 1px solid #e0e0e0;
+        border-radius: 8px;
+        padding: 12px;
+        margin: 8px 0;
+        background-color: white;
+        transition: all 0.2s ease;
+    }
+    .doc-container:hover {
+        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+        transform: translateY(-1px);
+    }
+    .doc-header {
+        display: flex;
+        justify-content: space-between;
+        align-items: center;
+        margin-bottom: 8px;
+    }
+    .doc-title {
+        font-weight: 600;
+        color: #1e88e5;
+    }
+    .doc-meta {
+        font-size: 0.9em;
+        color: #757575;
+    }
+    .kb-badge {
+        background-color: #e3f2fd;
+        color: #1565c0;
+        padding: 4px 8px;
+        border-radius: 12px;
+        font-size: 0.8em;
+    }
+    .doc-stats {
+        display: flex;
+        gap: 12px;
+        font-size: 0.85em;
+        color: #616161;
+        margin-top: 8px;
+    }
+    .doc-tags {
+        margin-top: 8px;
+    }
+    .doc-tags code {
+        margin-right: 4px;
+        font-size: 0.8em;
+    }
+    </style>
+"""
+
+@st.cache_resource
+def _inject_viewer_styles():
+    """Injecte les styles CSS ; l'élément est rejoué par le cache à chaque rerun"""
+    st.markdown(_VIEWER_CSS, unsafe_allow_html=True)
+
+_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
+@lru_cache(maxsize=4096)
+def _format_timestamp(timestamp: Union[int, float, str, None]) -> str:
+    """Formate une date (timestamp ou ISO 8601), mémoïsé par valeur brute"""
+    try:
+        if timestamp is None:
+            return "N/A"
+        # Si c'est une chaîne, essayer de la convertir en timestamp
+        if isinstance(timestamp, str):
+            try:
+                return datetime.fromisoformat(timestamp).strftime("%d/%m/%Y %H:%M")
+            except ValueError:
+                timestamp = int(float(timestamp))
+        return datetime.fromtimestamp(int(timestamp)).strftime("%d/%m/%Y %H:%M")
+    except (ValueError, TypeError, OverflowError, OSError):
+        return "N/A"
 
 class DocumentViewerComponent:
     def __init__(self, kb_manager: KnowledgeBaseManager):
@@ -12,56 +89,6 @@ class DocumentViewerComponent:
         # Initialisation du cache de session pour les filtres
         if 'doc_viewer_kb_filter' not in st.session_state:
             st.session_state.doc_viewer_kb_filter = []
-            
-        # Styles CSS personnalisés pour l'affichage
-        self._init_styles()
-
-    def _init_styles(self):
-        """Initialise les styles CSS pour l'affichage des documents"""
-        st.markdown("""
-            <style>
-            .doc-container {
-                border: 1px solid #e0e0e0;
-                border-radius: 8px;
-                padding: 12px;
-                margin: 8px 0;
-                background-color: white;
-                transition: all 0.2s ease;
-            }
-            .doc-container:hover {
-                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                transform: translateY(-1px);
-            }
-            .doc-header {
-                display: flex;
-                justify-content: space-between;
-                align-items: center;
-                margin-bottom: 8px;
-            }
-            .doc-title {
-                font-weight: 600;
-                color: #1e88e5;
-            }
-            .doc-meta {
-                font-size: 0.9em;
-                color: #757575;
-            }
-            .kb-badge {
-                background-color: #e3f2fd;
-                color: #1565c0;
-                padding: 4px 8px;
-                border-radius: 12px;
-                font-size: 0.8em;
-            }
-            .doc-stats {
-                display: flex;
-                gap: 12px;
-                font-size: 0.85em;
-                color: #616161;
-                margin-top: 8px;
-            }
-            </style>
-        """, unsafe_allow_html=True)
 
     def _format_size(self, size: Union[int, str, None]) -> str:
         """Formate la taille du fichier en unité lisible"""
@@ -69,57 +96,91 @@ class DocumentViewerComponent:
             size_bytes = int(size) if size is not None else 0
         except (ValueError, TypeError):
             return "N/A"
-            
-        for unit in ['B', 'KB', 'MB', 'GB']:
-            if size_bytes < 1024:
-                return f"{size_bytes:.1f} {unit}"
-            size_bytes /= 1024
-        return f"{size_bytes:.1f} TB"
+
+        # Indice de l'unité déduit directement du nombre de bits (1024 = 2**10)
+        i = min(max((max(size_bytes, 0).bit_length() - 1) // 10, 0), len(_UNITS) - 1)
+        return f"{size_bytes / (1 << (10 * i)):.1f} {_UNITS[i]}"
 
     def _format_date(self, timestamp: Union[int, str, None]) -> str:
         """Formate la date en format lisible"""
         try:
-            if timestamp is None:
-                return "N/A"
-            # Si c'est une chaîne, essayer de la convertir en timestamp
-            if isinstance(timestamp, str):
-                try:
-                    return datetime.fromisoformat(timestamp).strftime("%d/%m/%Y %H:%M")
-                except ValueError:
-                    timestamp = int(float(timestamp))
-            return datetime.fromtimestamp(int(timestamp)).strftime("%d/%m/%Y %H:%M")
-        except (ValueError, TypeError):
+            return _format_timestamp(timestamp)
+        except TypeError:  # Valeur non hachable : pas de mémoïsation possible
             return "N/A"
 
-    def _get_filtered_documents(self) -> Dict[str, Dict]:
+    def _get_filtered_documents(self, kb_list: List[Dict]) -> Dict[str, Dict]:
         """Récupère les documents filtrés par base"""
-        kb_list = self.kb_manager.list_knowledge_bases()
         documents_by_kb = {}
         
         selected_kbs = st.session_state.doc_viewer_kb_filter
+        kbs = [kb for kb in kb_list if not selected_kbs or kb["id"] in selected_kbs]
         
-        for kb in kb_list:
-            if not selected_kbs or kb["id"] in selected_kbs:
-                documents = self.kb_manager.list_documents(kb["id"])
-                if documents:  # Ne pas inclure les bases vides
-                    documents_by_kb[kb["id"]] = {
-                        "title": kb["title"],
-                        "docs": documents
-                    }
+        # Un seul appel groupé, mis en cache : seul un changement de filtre
+        # (ou une invalidation après ingestion/suppression) déclenche des accès aux bases
+        documents_per_kb = get_documents(self.kb_manager, (kb["id"] for kb in kbs))
+        for kb in kbs:
+            documents = documents_per_kb.get(kb["id"])
+            if documents:  # Ne pas inclure les bases vides
+                documents_by_kb[kb["id"]] = {
+                    "title": kb["title"],
+                    "docs": documents
+                }
         
         return documents_by_kb
 
+    @staticmethod
+    def _build_search_index(documents_by_kb: Dict[str, Dict]) -> Dict[tuple, str]:
+        """Construit le texte de recherche (titre, type, tags) en minuscules de chaque document"""
+        search_index = {}
+        for kb_id, kb_info in documents_by_kb.items():
+            for doc in kb_info["docs"]:
+                metadata = doc.get('metadata') or {}
+                search_index[(kb_id, doc['id'])] = (
+                    f"{doc.get('title') or ''} {metadata.get('file_type', '')} "
+                    f"{' '.join(metadata.get('tags', []))}"
+                ).lower()
+        return search_index
+
+    def _render_doc_card(self, doc: Dict, kb_title: str) -> str:
+        """Construit le HTML de la carte d'un document (tags inclus)"""
+        # Extraction sécurisée des métadonnées
+        metadata = doc.get('metadata', {})
+        file_type = metadata.get('file_type', 'N/A')
+        file_size = metadata.get('file_size')
+        created_on = doc.get('created_on')
+        tags = metadata.get('tags', [])
+        tags_html = (
+            f'<div class="doc-tags">{" ".join(f"<code>{tag}</code>" for tag in tags)}</div>'
+            if tags else ""
+        )
+
+        return f"""<div class="doc-container">
+<div class="doc-header">
+<span class="doc-title">📄 {doc.get('title', doc.get('id', 'Sans titre'))}</span>
+<span class="kb-badge">{kb_title}</span>
+</div>
+<div class="doc-meta">
+ID: {doc.get('id', 'N/A')}<br/>
+Type: {file_type}
+</div>
+<div class="doc-stats">
+<span>📅 {self._format_date(created_on)}</span>
+<span>📦 {self._format_size(file_size)}</span>
+</div>{tags_html}
+</div>"""
+
     def render(self):
         """Affiche l'interface de consultation des documents"""
         st.header("📚 Documents")
+        _inject_viewer_styles()
         
-        # Filtres
-        kb_list = self.kb_manager.list_knowledge_bases()
+        # Filtres (liste des bases mise en cache, partagée avec les autres onglets)
+        kb_list = get_kb_list(self.kb_manager)
         if not kb_list:
             st.warning("Aucune base de connaissances disponible.")
             return
             
-        kb_options = {kb["id"]: f"{kb['title']} ({kb['id']})" for kb in kb_list}
+        kb_options = get_kb_labels(self.kb_manager)
         
         st.multiselect(
             "Filtrer par base de connaissances",
@@ -129,11 +190,14 @@ class DocumentViewerComponent:
             placeholder="Toutes les bases"
         )
         
-        # Recherche
-        search_query = st.text_input("🔍 Rechercher un document", placeholder="Titre, type, tags...")
+        # Recherche dans un formulaire : un seul rerun à la validation (Entrée ou bouton),
+        # pas un par caractère saisi ; la dernière requête validée est conservée
+        with st.form("doc_search_form"):
+            search_query = st.text_input("🔍 Rechercher un document", placeholder="Titre, type, tags...")
+            st.form_submit_button("Rechercher")
         
         # Récupération et affichage des documents
-        documents_by_kb = self._get_filtered_documents()
+        documents_by_kb = self._get_filtered_documents(kb_list)
         
         if not documents_by_kb:
             if st.session_state.doc_viewer_kb_filter:
@@ -145,44 +209,17 @@ class DocumentViewerComponent:
         total_docs = sum(len(kb_info["docs"]) for kb_info in documents_by_kb.values())
         st.write(f"### {total_docs} documents trouvés")
         
+        # Texte de recherche en minuscules, construit une seule fois par document
+        query = search_query.lower()
+        search_index = self._build_search_index(documents_by_kb) if query else {}
+        
         for kb_id, kb_info in documents_by_kb.items():
             with st.expander(f"📁 {kb_info['title']} ({len(kb_info['docs'])} documents)", expanded=True):
-                for doc in kb_info["docs"]:
-                    # Filtrage par recherche
-                    if search_query:
-                        doc_metadata = doc.get('metadata', {})
-                        search_text = f"{doc['title']} {doc_metadata.get('file_type', '')} {' '.join(doc_metadata.get('tags', []))}"
-                        if search_query.lower() not in search_text.lower():
-                            continue
-                    
-                    # Extraction sécurisée des métadonnées
-                    metadata = doc.get('metadata', {})
-                    file_type = metadata.get('file_type', 'N/A')
-                    file_size = metadata.get('file_size')
-                    created_on = doc.get('created_on')
-                    tags = metadata.get('tags', [])
-                    
-                    # Affichage du document
-                    st.markdown(f"""
-                        <div class="doc-container">
-                            <div class="doc-header">
-                                <span class="doc-title">📄 {doc.get('title', doc.get('id', 'Sans titre'))}</span>
-                                <span class="kb-badge">{kb_info['title']}</span>
-                            </div>
-                            <div class="doc-meta">
-                                ID: {doc.get('id', 'N/A')}<br/>
-                                Type: {file_type}
-                            </div>
-                            <div class="doc-stats">
-                                <span>📅 {self._format_date(created_on)}</span>
-                                <span>📦 {self._format_size(file_size)}</span>
-                            </div>
-                        </div>
-                    """, unsafe_allow_html=True)
-                    
-                    # Affichage des tags si présents
-                    if tags:
-                        st.markdown(' '.join([f'`{tag}`' for tag in tags]))
-                    
-                    # Ligne de séparation entre les documents
-                    #st.markdown("---")
\ No newline at end of file
+                # Toutes les cartes de la base sont émises en un seul appel st.markdown
+                cards = [
+                    self._render_doc_card(doc, kb_info['title'])
+                    for doc in kb_info["docs"]
+                    if not query or query in search_index[(kb_id, doc['id'])]
+                ]
+                if cards:
+                    st.markdown("\n".join(cards), unsafe_allow_html=True)
\ No newline at end of file
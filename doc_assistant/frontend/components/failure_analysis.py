@@ -4,40 +4,39 @@ import streamlit as st
 from typing import List, Optional, Callable
 from backend.agents.no_result_handler_agent import SearchFailureAnalysis
 
+_FAILURE_CSS = """
+    <style>
+    .failure-box {
+        border: 1px solid #ff4b4b;
+        border-radius: 4px;
+        padding: 1rem;
+        margin: 1rem 0;
+    }
+    .suggestion-box {
+        border: 1px solid #ffa726;
+        border-radius: 4px;
+        padding: 1rem;
+        margin: 0.5rem 0;
+        background-color: #fff3e0;
+    }
+    .retry-box {
+        border: 1px solid #2196f3;
+        border-radius: 4px;
+        padding: 1rem;
+        margin: 0.5rem 0;
+        background-color: #e3f2fd;
+    }
+    </style>
+"""
+
+@st.cache_resource
+def _inject_failure_styles():
+    """Injecte les styles CSS ; l'élément est rejoué par le cache à chaque rerun"""
+    st.markdown(_FAILURE_CSS, unsafe_allow_html=True)
+
 class FailureAnalysisComponent:
     """Composant pour afficher l'analyse des échecs de recherche"""
     
-    def __init__(self):
-        # Initialisation des styles personnalisés
-        self._init_styles()
-        
-    def _init_styles(self):
-        """Initialise les styles CSS personnalisés"""
-        st.markdown("""
-            <style>
-            .failure-box {
-                border: 1px solid #ff4b4b;
-                border-radius: 4px;
-                padding: 1rem;
-                margin: 1rem 0;
-            }
-            .suggestion-box {
-                border: 1px solid #ffa726;
-                border-radius: 4px;
-                padding: 1rem;
-                margin: 0.5rem 0;
-                background-color: #fff3e0;
-            }
-            .retry-box {
-                border: 1px solid #2196f3;
-                border-radius: 4px;
-                padding: 1rem;
-                margin: 0.5rem 0;
-                background-color: #e3f2fd;
-            }
-            </style>
-        """, unsafe_allow_html=True)
-    
     def render(
         self,
         analysis: SearchFailureAnalysis,
@@ -50,6 +49,8 @@ class FailureAnalysisComponent:
             analysis: Analyse de l'échec de recherche
             on_retry_query: Callback pour réessayer avec une requête reformulée
         """
+        _inject_failure_styles()
+        
         # En-tête avec le type d'échec
         failure_titles = {
             "no_kb": "🚫 Aucune base de connaissances pertinente",
@@ -100,6 +101,7 @@ class FailureAnalysisComponent:
     
     def render_mini(self, analysis: SearchFailureAnalysis):
         """Version compacte pour affichage dans le chat"""
+        _inject_failure_styles()
         with st.container():
             st.markdown(f"**{analysis.possible_causes[0]}**")
             
@@ -2,8 +2,12 @@ from typing import Optional, Dict, List, Tuple
 import streamlit as st
 from backend.kb_management.manager import KnowledgeBaseManager 
 from backend.utils.filter_utils import SearchFilter
-from functools import lru_cache
-import time
+from frontend.utils.resources import get_documents, get_kb_index, get_kb_list, invalidate_kb_caches, kb_cache_generation
+
+@st.cache_data(show_spinner=False)
+def _format_kb_options(kb_pairs: Tuple[Tuple[str, str], ...]) -> Dict[str, str]:
+    """Libellés d'affichage des bases, mis en cache par couples (id, titre)"""
+    return {kb_id: f"{kb_id} - {title}" for kb_id, title in kb_pairs}
 
 class FilterTab:
     def __init__(self, kb_manager: KnowledgeBaseManager):
@@ -12,79 +16,63 @@ class FilterTab:
         # Initialisation des états de session
         if 'selected_filters' not in st.session_state:
             st.session_state.selected_filters = SearchFilter()
-        if 'kb_cache_timestamp' not in st.session_state:
-            st.session_state.kb_cache_timestamp = time.time()
-        if 'doc_cache' not in st.session_state:
-            st.session_state.doc_cache = {}
-        if 'reset_triggered' not in st.session_state:
-            st.session_state.reset_triggered = False
-
-    @lru_cache(maxsize=32)
-    def _get_cached_kb_list(self, cache_timestamp: float) -> List[Dict]:
-        """
-        Récupère la liste des bases avec mise en cache.
-        Le timestamp permet d'invalider le cache quand nécessaire.
-        """
-        return self.kb_manager.list_knowledge_bases()
-
-    def _get_cached_documents(self, kb_id: str) -> List[Dict]:
-        """
-        Récupère les documents d'une base avec mise en cache locale
-        """
-        if kb_id not in st.session_state.doc_cache:
-            st.session_state.doc_cache[kb_id] = {
-                'timestamp': time.time(),
-                'docs': self.kb_manager.list_documents(kb_id)
-            }
-        return st.session_state.doc_cache[kb_id]['docs']
 
     def _invalidate_caches(self):
-        """Force le rafraîchissement des caches"""
-        st.session_state.kb_cache_timestamp = time.time()
-        st.session_state.doc_cache.clear()
-        self._get_cached_kb_list.cache_clear()
+        """Force le rafraîchissement des caches (bases et documents, voir frontend.utils.resources)"""
+        invalidate_kb_caches()
 
-    def _format_kb_options(self, kb_list: List[Dict]) -> Dict[str, str]:
-        """
-        Prépare le format d'affichage des bases
+    def _bulk_load(self, kb_ids: List[str]) -> Dict[str, Dict[str, str]]:
         """
-        return {
-            kb["id"]: f"{kb['id']} - {kb['title']}"
-            for kb in kb_list
-        }
-
-    def _lazy_load_documents(self, kb_id: str) -> Dict[str, str]:
-        """
-        Charge les documents d'une base de manière optimisée
+        Charge en un seul appel (mis en cache) les titres des documents de plusieurs bases
+        
+        Returns:
+            Dict[str, Dict[str, str]]: {kb_id: {doc_id: titre}}
         """
-        documents = self._get_cached_documents(kb_id)
         return {
-            doc["id"]: doc["title"] or doc["id"]
-            for doc in documents
+            kb_id: {doc["id"]: doc["title"] or doc["id"] for doc in documents}
+            for kb_id, documents in get_documents(self.kb_manager, kb_ids).items()
         }
 
-    def _on_change_callback(self):
-        """Callback appelé lorsque une sélection change"""
+    def _on_kb_changed(self):
+        """Callback de la sélection des bases : ne conserve que les documents des bases encore sélectionnées"""
         selected_kb = st.session_state.get('filter_kb_select', [])
-        selected_docs = {}
-        
-        if selected_kb:
-            # Récupérer les documents sélectionnés pour chaque base
-            for idx, kb_id in enumerate(selected_kb):
-                key = f"filter_docs_select_{kb_id}_{idx}"
-                if key in st.session_state and st.session_state[key]:
-                    selected_docs[kb_id] = st.session_state[key]
+        current_docs = st.session_state.selected_filters.doc_ids or {}
+        doc_ids = {kb_id: docs for kb_id, docs in current_docs.items() if kb_id in selected_kb}
         
-        # Mettre à jour les filtres
         st.session_state.selected_filters = SearchFilter(
             kb_ids=selected_kb if selected_kb else None,
-            doc_ids=selected_docs if selected_docs else None
+            doc_ids=doc_ids if doc_ids else None
+        )
+
+    def _on_docs_changed(self, kb_id: str):
+        """Callback d'une base : seule son entrée de documents est mise à jour"""
+        search_filter = st.session_state.selected_filters
+        # Copie : le filtre courant n'est jamais modifié en place
+        doc_ids = dict(search_filter.doc_ids or {})
+        
+        # Les documents ne comptent que si le sélecteur de la base est ouvert
+        selected_docs = None
+        if st.session_state.get(f"filter_docs_open_{kb_id}"):
+            selected_docs = st.session_state.get(f"filter_docs_select_{kb_id}")
+        
+        if selected_docs:
+            doc_ids[kb_id] = selected_docs
+        else:
+            doc_ids.pop(kb_id, None)
+        st.session_state.selected_filters = SearchFilter(
+            kb_ids=search_filter.kb_ids,
+            doc_ids=doc_ids if doc_ids else None
         )
 
     def _trigger_reset(self):
-        """Déclenche la réinitialisation"""
-        st.session_state.reset_triggered = True
+        """
+        Réinitialise les filtres (callback du bouton) : exécuté avant le rerun
+        déclenché par le clic, les widgets sont donc recréés directement vides
+        """
         st.session_state.selected_filters = SearchFilter()
+        st.session_state.filter_kb_select = []
+        for key in [k for k in st.session_state if str(k).startswith("filter_docs_")]:
+            del st.session_state[key]
         self._invalidate_caches()
 
     def _display_active_filters(self, search_filter: SearchFilter):
@@ -96,76 +84,117 @@ class FilterTab:
             st.info("Aucun filtre actif - tous les documents seront inclus dans la recherche")
             return
 
-        kb_list = self._get_cached_kb_list(st.session_state.kb_cache_timestamp)
-        kb_dict = {kb["id"]: kb for kb in kb_list}
-
-        # Affichage des bases sélectionnées sans documents spécifiques
-        kb_only = [kb_id for kb_id in search_filter.get_kb_ids() 
-                  if not search_filter.doc_ids or kb_id not in search_filter.doc_ids]
+        # Le contenu (titres, listes markdown) n'est recalculé que si le filtre
+        # ou les bases ont changé depuis le dernier affichage
+        signature = (search_filter.cache_key(), kb_cache_generation())
+        if st.session_state.get('_last_filter_sig') != signature:
+            st.session_state._last_filter_view = self._build_active_filters_view(search_filter)
+            st.session_state._last_filter_sig = signature
+        kb_only_md, kb_docs_sections = st.session_state._last_filter_view
         
-        if kb_only:
+        if kb_only_md:
             st.write("🗄️ **Bases complètes sélectionnées:**")
-            for kb_id in kb_only:
-                if kb_id in kb_dict:
-                    st.markdown(f"- {kb_dict[kb_id]['title']} (`{kb_id}`)")
+            st.markdown(kb_only_md)
 
-        # Affichage des bases avec documents spécifiques
-        if search_filter.doc_ids:
+        if kb_docs_sections:
             st.write("📑 **Documents sélectionnés par base:**")
-            for kb_id, doc_ids in search_filter.doc_ids.items():
-                if kb_id in kb_dict:
-                    with st.expander(f"📚 {kb_dict[kb_id]['title']} ({len(doc_ids)} documents)"):
-                        doc_options = self._lazy_load_documents(kb_id)
-                        for doc_id in doc_ids:
-                            st.markdown(f"- {doc_options.get(doc_id, doc_id)}")
+            for label, docs_md in kb_docs_sections:
+                with st.expander(label):
+                    st.markdown(docs_md)
+
+    def _build_active_filters_view(self, search_filter: SearchFilter) -> Tuple[str, List[Tuple[str, str]]]:
+        """
+        Prépare le résumé des filtres actifs
+        
+        Returns:
+            Tuple[str, List[Tuple[str, str]]]: (markdown des bases complètes,
+            [(titre de l'expander, markdown des documents)] par base)
+        """
+        kb_dict = get_kb_index(self.kb_manager)
+
+        # Un seul parcours : bases complètes d'un côté, bases avec documents spécifiques de l'autre
+        doc_map = search_filter.doc_ids or {}
+        kb_only, kb_with_docs = [], []
+        for kb_id in search_filter.get_kb_ids():
+            if kb_id in kb_dict:
+                (kb_with_docs if kb_id in doc_map else kb_only).append(kb_id)
+        
+        kb_only_md = "\n".join(f"- {kb_dict[kb_id]['title']} (`{kb_id}`)" for kb_id in kb_only)
+
+        # Titres de toutes les bases concernées chargés en un seul appel
+        titles_by_kb = self._bulk_load(kb_with_docs) if kb_with_docs else {}
+        kb_docs_sections = []
+        for kb_id in kb_with_docs:
+            doc_ids = doc_map[kb_id]
+            doc_options = titles_by_kb.get(kb_id, {})
+            kb_docs_sections.append((
+                f"📚 {kb_dict[kb_id]['title']} ({len(doc_ids)} documents)",
+                "\n".join(f"- {doc_options.get(doc_id, doc_id)}" for doc_id in doc_ids)
+            ))
+        
+        return kb_only_md, kb_docs_sections
 
     def render(self) -> Optional[SearchFilter]:
         """Interface de filtrage optimisée"""
+        self._render_filters()
+        return st.session_state.selected_filters
+
+    @st.fragment
+    def _render_filters(self):
+        """
+        Widgets de filtrage, exécutés comme fragment : une interaction ne relance
+        que ce bloc, pas toute l'application. Les filtres restent dans
+        st.session_state.selected_filters et sont lus au prochain rerun complet.
+        """
         st.subheader("🔍 Filtrer les documents")
         
         # Récupération des bases avec cache
-        kb_list = self._get_cached_kb_list(st.session_state.kb_cache_timestamp)
-        kb_options = self._format_kb_options(kb_list)
+        kb_list = get_kb_list(self.kb_manager)
+        kb_options = _format_kb_options(tuple((kb["id"], kb["title"]) for kb in kb_list))
         
         # Sélection des bases avec callback de changement
-        default_value = [] if st.session_state.reset_triggered else None
         selected_kb = st.multiselect(
             "Sélectionner des bases de connaissances", 
             options=list(kb_options.keys()),
             format_func=lambda x: kb_options[x],
             key="filter_kb_select",
-            on_change=self._on_change_callback,
-            default=default_value
+            on_change=self._on_kb_changed
         )
-
-        # Réinitialiser le flag de reset après la création du multiselect
-        if st.session_state.reset_triggered:
-            st.session_state.reset_triggered = False
         
         # Container pour les sélections de documents
         doc_container = st.container()
         
-        # Chargement progressif des documents par base
+        # Chargement à la demande : les documents d'une base ne sont listés
+        # (et le sélecteur créé) que si l'utilisateur active le filtre par document
         if selected_kb:
             with doc_container:
-                for idx, kb_id in enumerate(selected_kb):
-                    doc_options = self._lazy_load_documents(kb_id)
-                    
-                    st.multiselect(
+                open_pickers = {}
+                for kb_id in selected_kb:
+                    slot = st.container()
+                    if slot.toggle(
+                        f"📄 Filtrer les documents de {kb_id}",
+                        key=f"filter_docs_open_{kb_id}",
+                        on_change=self._on_docs_changed,
+                        args=(kb_id,)
+                    ):
+                        open_pickers[kb_id] = slot
+                
+                # Documents de toutes les bases ouvertes récupérés en un seul appel
+                titles_by_kb = self._bulk_load(list(open_pickers)) if open_pickers else {}
+                for kb_id, slot in open_pickers.items():
+                    doc_options = titles_by_kb.get(kb_id, {})
+                    slot.multiselect(
                         f"Documents dans {kb_id}",
                         options=list(doc_options.keys()),
-                        format_func=lambda x: doc_options[x],
-                        key=f"filter_docs_select_{kb_id}_{idx}",
-                        on_change=self._on_change_callback
+                        format_func=lambda x, options=doc_options: options[x],
+                        key=f"filter_docs_select_{kb_id}",
+                        on_change=self._on_docs_changed,
+                        args=(kb_id,)
                     )
 
-        # Bouton de réinitialisation
-        if st.button("🔄 Réinitialiser", use_container_width=True):
-            self._trigger_reset()
-            st.rerun()
+        # Bouton de réinitialisation : le rerun naturel du clic suffit
+        st.button("🔄 Réinitialiser", use_container_width=True, on_click=self._trigger_reset)
 
         # Affichage des filtres actifs
         if st.session_state.selected_filters.has_filters():
-            self._display_active_filters(st.session_state.selected_filters)
-        
-        return st.session_state.selected_filters
\ No newline at end of file
+            self._display_active_filters(st.session_state.selected_filters)
\ No newline at end of file
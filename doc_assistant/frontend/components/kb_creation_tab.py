@@ -4,9 +4,23 @@ import streamlit as st
 from pathlib import Path
 from typing import Tuple, Optional
 from backend.kb_management.manager import KnowledgeBaseManager
+from frontend.utils.resources import get_kb_index, invalidate_kb_caches
 import os 
 import json
 
+# Options des sélecteurs calculées une fois à l'import : les catalogues de modèles
+# sont des constantes de classe du gestionnaire
+_EMBEDDING_MODELS = {
+    provider: tuple(cfg["models"])
+    for provider, cfg in KnowledgeBaseManager.SUPPORTED_EMBEDDING_MODELS.items()
+}
+_EMBEDDING_PROVIDERS = tuple(_EMBEDDING_MODELS)
+_RERANKER_MODELS = {
+    provider: tuple(cfg["models"])
+    for provider, cfg in KnowledgeBaseManager.SUPPORTED_RERANKERS.items()
+}
+_RERANKER_PROVIDERS = tuple(_RERANKER_MODELS)
+
 class KBCreationComponent:
     """Composant pour la création de nouvelles bases de connaissances"""
     
@@ -48,17 +62,14 @@ class KBCreationComponent:
         
         provider = st.selectbox(
             "Fournisseur d'embedding",
-            options=list(self.kb_manager.SUPPORTED_EMBEDDING_MODELS.keys()),
+            options=_EMBEDDING_PROVIDERS,
             help="Service fournissant le modèle d'embedding",
             key="embedding_provider_select"
         )
         
-        # Récupérer les modèles disponibles pour ce provider
-        available_models = self.kb_manager.SUPPORTED_EMBEDDING_MODELS[provider]["models"]
-        
         model = st.selectbox(
             "Modèle d'embedding",
-            options=available_models,
+            options=_EMBEDDING_MODELS[provider],
             help="Modèle spécifique à utiliser pour l'embedding",
             key="embedding_model_select"
         )
@@ -92,17 +103,14 @@ class KBCreationComponent:
         
         provider = st.selectbox(
             "Fournisseur de reranking",
-            options=list(self.kb_manager.SUPPORTED_RERANKERS.keys()),
+            options=_RERANKER_PROVIDERS,
             help="Service fournissant le modèle de reranking",
             key="reranker_provider_select"
         )
         
-        # Récupérer les modèles disponibles pour ce provider
-        available_models = self.kb_manager.SUPPORTED_RERANKERS[provider]["models"]
-        
         model = st.selectbox(
             "Modèle de reranking",
-            options=available_models,
+            options=_RERANKER_MODELS[provider],
             help="Modèle spécifique à utiliser pour le reranking",
             key="reranker_model_select"
         )
@@ -119,9 +127,10 @@ class KBCreationComponent:
             st.error("Le titre de la base est obligatoire")
             return False
             
-        # Vérifier si l'ID existe déjà
-        existing_kbs = self.kb_manager.list_knowledge_bases()
-        if any(kb["id"] == kb_id for kb in existing_kbs):
+        # Vérifier si l'ID existe déjà : index en cache (O(1)), puis un seul stat du
+        # fichier de métadonnées pour couvrir une base créée depuis la mise en cache
+        if (kb_id in get_kb_index(self.kb_manager)
+                or os.path.exists(Path(self.kb_manager.metadata_dir) / f"{kb_id}.json")):
             st.error(f"Une base avec l'ID '{kb_id}' existe déjà")
             return False
             
@@ -181,6 +190,8 @@ class KBCreationComponent:
                             llm_provider=llm_provider
                         )
 
+                        # Invalider les listes de bases mises en cache
+                        invalidate_kb_caches()
                         st.success(f"✅ Base de connaissances '{title}' créée avec succès!")
                         return True
                                     
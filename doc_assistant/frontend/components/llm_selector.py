@@ -1,86 +1,135 @@
 # doc_assistant/frontend/components/llm_selector.py
 import streamlit as st
 from pathlib import Path
+from types import MappingProxyType
+from collections import namedtuple
 from dsrag.llm import OpenAIChatAPI, AnthropicChatAPI, LLM
 
+# Feuille de style lue une seule fois, à l'import du module
+_CSS_PATH = Path(__file__).parent.parent / "styles" / "llm_selector.css"
+_CSS_BLOCK = f"<style>{_CSS_PATH.read_text()}</style>"
+
+@st.cache_resource
+def _inject_llm_selector_styles():
+    """Injecte les styles CSS ; l'élément est rejoué par le cache à chaque rerun"""
+    st.markdown(_CSS_BLOCK, unsafe_allow_html=True)
+
+# Description d'un modèle proposé (tuple nommé, immuable)
+_Model = namedtuple("Model", "id name description")
+
+# Configuration des providers, figée en lecture seule à l'import du module
+_LLM_CONFIGS = MappingProxyType({
+    "OpenAI": MappingProxyType({
+        "class": OpenAIChatAPI,
+        "color": "#74AA9C",
+        "models": (
+            _Model(
+                id="gpt-4-0125-preview",
+                name="GPT-4 Turbo Preview",
+                description="Version la plus récente et performante"
+            ),
+            _Model(
+                id="gpt-4-turbo-preview",
+                name="GPT-4 Turbo",
+                description="Excellent rapport performance/coût"
+            ),
+            _Model(
+                id="gpt-4",
+                name="GPT-4",
+                description="Modèle stable et fiable"
+            ),
+            _Model(
+                id="gpt-3.5-turbo",
+                name="GPT-3.5 Turbo",
+                description="Rapide et économique"
+            )
+        ),
+        "default_model": "gpt-4-turbo-preview",
+        "default_temp": 0.2,
+        "default_max_tokens": 1000
+    }),
+    "Anthropic": MappingProxyType({
+        "class": AnthropicChatAPI,
+        "color": "#000000",
+        "models": (
+            _Model(
+                id="claude-3-opus-20240229",
+                name="Claude 3 Opus",
+                description="Le plus performant des modèles Claude"
+            ),
+            _Model(
+                id="claude-3-sonnet-20240229",
+                name="Claude 3 Sonnet",
+                description="Bon compromis performance/rapidité"
+            ),
+            _Model(
+                id="claude-3-haiku-20240307",
+                name="Claude 3 Haiku",
+                description="Version rapide et économique"
+            )
+        ),
+        "default_model": "claude-3-sonnet-20240229",
+        "default_temp": 0.2,
+        "default_max_tokens": 1000
+    })
+})
+
 class LLMSelector:
-    LLM_CONFIGS = {
-        "OpenAI": {
-            "class": OpenAIChatAPI,
-            "color": "#74AA9C",
-            "models": [
-                {
-                    "id": "gpt-4-0125-preview",
-                    "name": "GPT-4 Turbo Preview",
-                    "description": "Version la plus récente et performante"
-                },
-                {
-                    "id": "gpt-4-turbo-preview",
-                    "name": "GPT-4 Turbo",
-                    "description": "Excellent rapport performance/coût"
-                },
-                {
-                    "id": "gpt-4",
-                    "name": "GPT-4",
-                    "description": "Modèle stable et fiable"
-                },
-                {
-                    "id": "gpt-3.5-turbo",
-                    "name": "GPT-3.5 Turbo",
-                    "description": "Rapide et économique"
-                }
-            ],
-            "default_model": "gpt-4-turbo-preview",
-            "default_temp": 0.2,
-            "default_max_tokens": 1000
-        },
-        "Anthropic": {
-            "class": AnthropicChatAPI,
-            "color": "#000000",
-            "models": [
-                {
-                    "id": "claude-3-opus-20240229",
-                    "name": "Claude 3 Opus",
-                    "description": "Le plus performant des modèles Claude"
-                },
-                {
-                    "id": "claude-3-sonnet-20240229",
-                    "name": "Claude 3 Sonnet",
-                    "description": "Bon compromis performance/rapidité"
-                },
-                {
-                    "id": "claude-3-haiku-20240307",
-                    "name": "Claude 3 Haiku",
-                    "description": "Version rapide et économique"
-                }
-            ],
-            "default_model": "claude-3-sonnet-20240229",
-            "default_temp": 0.2,
-            "default_max_tokens": 1000
-        }
+    LLM_CONFIGS = _LLM_CONFIGS
+
+    # Tables de correspondance dérivées de LLM_CONFIGS, construites une seule fois
+    _PROVIDER_KEYS = tuple(LLM_CONFIGS)
+    _PROVIDER_INDEX = {provider: i for i, provider in enumerate(_PROVIDER_KEYS)}
+    _MODEL_OPTIONS = {
+        provider: {m.id: f"{m.name} - {m.description}" for m in cfg["models"]}
+        for provider, cfg in LLM_CONFIGS.items()
+    }
+    _MODEL_KEYS = {provider: tuple(options) for provider, options in _MODEL_OPTIONS.items()}
+    _MODEL_INDEX = {
+        provider: {model_id: i for i, model_id in enumerate(keys)}
+        for provider, keys in _MODEL_KEYS.items()
+    }
+    _MODEL_ID_TO_NAME = {
+        provider: {m.id: m.name for m in cfg["models"]}
+        for provider, cfg in LLM_CONFIGS.items()
+    }
+    # Valeurs initiales de l'état de session
+    _SESSION_DEFAULTS = {
+        'llm_provider': "OpenAI",
+        'llm_model': LLM_CONFIGS["OpenAI"]["default_model"],
+        'llm_temperature': LLM_CONFIGS["OpenAI"]["default_temp"],
+        'llm_max_tokens': LLM_CONFIGS["OpenAI"]["default_max_tokens"]
     }
 
     def __init__(self):
-        if 'llm_provider' not in st.session_state:
-            st.session_state.llm_provider = "OpenAI"
-        if 'llm_model' not in st.session_state:
-            st.session_state.llm_model = self.LLM_CONFIGS["OpenAI"]["default_model"]
-        if 'llm_temperature' not in st.session_state:
-            st.session_state.llm_temperature = self.LLM_CONFIGS["OpenAI"]["default_temp"]
-        if 'llm_max_tokens' not in st.session_state:
-            st.session_state.llm_max_tokens = self.LLM_CONFIGS["OpenAI"]["default_max_tokens"]
+        # Initialisation en une seule mise à jour groupée, une fois par session :
+        # aux reruns suivants, seule la clé sentinelle est consultée
+        if not st.session_state.get('_llm_selector_init'):
+            st.session_state.update({
+                **{k: v for k, v in self._SESSION_DEFAULTS.items() if k not in st.session_state},
+                '_llm_selector_init': True
+            })
         
-        # Charger le CSS
-        css_path = Path(__file__).parent.parent / "styles" / "llm_selector.css"
-        with open(css_path) as f:
-            st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+        # Charger le CSS (contenu mis en cache au niveau du module)
+        _inject_llm_selector_styles()
+
+    def _build_summary_html(self, provider: str, model: str, temperature: float, max_tokens: int) -> str:
+        """Construit le HTML du panneau « Configuration actuelle »"""
+        model_name = self._MODEL_ID_TO_NAME[provider].get(model, model)
+        return f"""<div class="config-summary">
+<h3>📊 Configuration actuelle</h3>
+<div class="config-summary-grid">
+<ul><li><strong>Provider</strong>: {provider}</li><li><strong>Modèle</strong>: {model_name}</li></ul>
+<ul><li><strong>Température</strong>: {temperature}</li><li><strong>Tokens max</strong>: {max_tokens}</li></ul>
+</div>
+</div>"""
 
     def render(self) -> LLM:
         # Remplacer les boutons individuels par un selectbox pour le provider
         provider = st.selectbox(
             "Provider",
-            options=list(self.LLM_CONFIGS.keys()),
-            index=list(self.LLM_CONFIGS.keys()).index(st.session_state.llm_provider)
+            options=self._PROVIDER_KEYS,
+            index=self._PROVIDER_INDEX[st.session_state.llm_provider]
         )
         
         if provider != st.session_state.llm_provider:
@@ -89,14 +138,13 @@ class LLMSelector:
         
         # Utiliser un radio pour les modèles au lieu de boutons
         current_config = self.LLM_CONFIGS[st.session_state.llm_provider]
-        model_options = {m["id"]: f"{m['name']} - {m['description']}" 
-                        for m in current_config["models"]}
+        model_options = self._MODEL_OPTIONS[st.session_state.llm_provider]
         
         selected_model = st.radio(
             "Modèle",
-            options=list(model_options.keys()),
-            format_func=lambda x: model_options[x],
-            index=list(model_options.keys()).index(st.session_state.llm_model)
+            options=self._MODEL_KEYS[st.session_state.llm_provider],
+            format_func=model_options.__getitem__,
+            index=self._MODEL_INDEX[st.session_state.llm_provider][st.session_state.llm_model]
         )
         
         if selected_model != st.session_state.llm_model:
@@ -119,29 +167,22 @@ class LLMSelector:
                     100
                 )
 
-        # Affichage de la configuration active
-        selected_model_name = next(
-            (m['name'] for m in current_config['models'] if m['id'] == st.session_state.llm_model),
-            st.session_state.llm_model
+        # Affichage de la configuration active : HTML mis en cache tant que la configuration
+        # ne change pas, émis en un seul st.markdown
+        summary_key = (
+            st.session_state.llm_provider,
+            st.session_state.llm_model,
+            st.session_state.llm_temperature,
+            st.session_state.llm_max_tokens
         )
-
-        st.markdown("<div class='config-summary'>", unsafe_allow_html=True)
-        st.markdown("### 📊 Configuration actuelle")
-        col1, col2 = st.columns(2)
-        with col1:
-            st.markdown(f"""
-                - **Provider**: {st.session_state.llm_provider}
-                - **Modèle**: {selected_model_name}
-            """)
-        with col2:
-            st.markdown(f"""
-                - **Température**: {st.session_state.llm_temperature}
-                - **Tokens max**: {st.session_state.llm_max_tokens}
-            """)
-        st.markdown("</div>", unsafe_allow_html=True)
+        cached = st.session_state.get('_llm_summary_cache')
+        if cached is None or cached[0] != summary_key:
+            cached = (summary_key, self._build_summary_html(*summary_key))
+            st.session_state._llm_summary_cache = cached
+        st.markdown(cached[1], unsafe_allow_html=True)
 
         return current_config["class"](
             model=st.session_state.llm_model,
             temperature=st.session_state.llm_temperature,
             max_tokens=st.session_state.llm_max_tokens
-        )
\ No newline at end of file
+        )
@@ -0,0 +1,149 @@
+"""
+Shared Streamlit resources
+
+Created: 2024-10-30
+"""
+# frontend/utils/resources.py
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from backend.kb_management.manager import KnowledgeBaseManager
+from backend.agents.search_agent import SearchAgent
+
+
+@st.cache_resource
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Pool de threads partagé par l'application.
+    Mis en cache via st.cache_resource pour survivre aux reruns Streamlit.
+    """
+    return ThreadPoolExecutor(max_workers=8, thread_name_prefix="doc_assistant")
+
+
+@st.cache_resource
+def get_kb_manager(storage_directory: str) -> KnowledgeBaseManager:
+    """
+    Gestionnaire de bases unique par dossier de stockage.
+    Évite de recréer le client ChromaDB et le registre des bases ouvertes à chaque rerun.
+    """
+    return KnowledgeBaseManager(storage_directory=storage_directory)
+
+
+@st.cache_resource
+def get_search_agent(storage_directory: str, _kb_manager: KnowledgeBaseManager) -> SearchAgent:
+    """
+    Agent de recherche unique par dossier de stockage (sans état de session).
+    Évite de revérifier les ressources NLTK et de recharger les stop words à chaque rerun.
+    """
+    return SearchAgent(_kb_manager)
+
+
+class _CacheGeneration:
+    """Compteur d'invalidation des caches de bases/documents, commun à toutes les sessions"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def bump(self) -> None:
+        with self._lock:
+            self.value += 1
+
+
+@st.cache_resource
+def _kb_cache_generation() -> _CacheGeneration:
+    """Génération unique par processus : les caches st.cache_data sont globaux, leur clé doit l'être aussi"""
+    return _CacheGeneration()
+
+
+def kb_cache_generation() -> int:
+    """Génération courante des caches de bases/documents (change à chaque invalidate_kb_caches)"""
+    return _kb_cache_generation().value
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_kb_list(_kb_manager: KnowledgeBaseManager, generation: int) -> List[Dict]:
+    """Liste des bases mise en cache ; `generation` sert de clé d'invalidation"""
+    return _kb_manager.list_knowledge_bases()
+
+
+def invalidate_kb_caches() -> None:
+    """
+    Invalide les listes de bases et de documents en cache, pour toutes les sessions.
+    À appeler après toute création/suppression de base ou ajout/suppression de documents.
+    """
+    _kb_cache_generation().bump()
+
+
+def get_kb_list(kb_manager: KnowledgeBaseManager) -> List[Dict]:
+    """
+    Liste des bases de connaissances, partagée entre sessions.
+    Invalidée dans toutes les sessions par invalidate_kb_caches (création/suppression).
+    """
+    return _cached_kb_list(kb_manager, kb_cache_generation())
+
+
+def get_kb_index(kb_manager: KnowledgeBaseManager) -> Dict[str, Dict]:
+    """Index {kb_id: infos de la base} construit à partir de get_kb_list"""
+    return {kb["id"]: kb for kb in get_kb_list(kb_manager)}
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_kb_labels(_kb_manager: KnowledgeBaseManager, generation: int) -> Dict[str, str]:
+    return {
+        kb["id"]: f"{kb['title']} ({kb['id']})"
+        for kb in _cached_kb_list(_kb_manager, generation)
+    }
+
+
+def get_kb_labels(kb_manager: KnowledgeBaseManager) -> Dict[str, str]:
+    """Libellés « titre (id) » des bases indexés par id, avec la même invalidation que get_kb_list"""
+    return _cached_kb_labels(kb_manager, kb_cache_generation())
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _cached_documents(
+    _kb_manager: KnowledgeBaseManager,
+    kb_ids: Tuple[str, ...],
+    generation: int
+) -> Dict[str, List[Dict]]:
+    """Documents de plusieurs bases mis en cache ; `generation` sert de clé d'invalidation"""
+    return _kb_manager.list_documents_bulk(list(kb_ids))
+
+
+def get_documents(kb_manager: KnowledgeBaseManager, kb_ids: Iterable[str]) -> Dict[str, List[Dict]]:
+    """
+    Documents de plusieurs bases ({kb_id: documents}), récupérés en un seul appel,
+    partagés entre sessions (clé : ensemble des bases et génération du processus)
+    et évincés après 5 minutes.
+    Invalidés dans toutes les sessions par invalidate_kb_caches.
+    """
+    return _cached_documents(kb_manager, tuple(sorted(set(kb_ids))), kb_cache_generation())
+
+
+def with_script_ctx(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Enveloppe `fn` pour qu'elle s'exécute avec le contexte du script Streamlit
+    courant, afin de pouvoir accéder à st.session_state depuis un thread du pool.
+    Le contexte précédent du thread est restauré ensuite : un thread du pool
+    partagé ne doit pas garder la session d'un autre utilisateur attachée.
+    """
+    ctx = get_script_run_ctx()
+
+    def _run(*args: Any, **kwargs: Any) -> Any:
+        thread = threading.current_thread()
+        previous = get_script_run_ctx()
+        add_script_run_ctx(thread, ctx)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            add_script_run_ctx(thread, previous)
+
+    return _run
+
+
+def submit(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+    """Soumet une tâche au pool partagé avec le contexte Streamlit courant"""
+    return get_executor().submit(with_script_ctx(fn), *args, **kwargs)
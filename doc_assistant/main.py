@@ -8,12 +8,16 @@ from frontend.components.delete_docs_tab import DeleteDocsComponent
 from frontend.components.delete_kb_tab import DeleteKBComponent
 from frontend.components.chat_window import ChatWindow
 from frontend.components.document_viewer_tab import DocumentViewerComponent
-from backend.kb_management.manager import KnowledgeBaseManager
 from backend.agents.orchestrator import AgentOrchestrator
 from backend.agents.query_kb_mapper_agent import QueryKBMapper
-from backend.agents.search_agent import SearchAgent
 from backend.utils.config import ConfigManager
 from frontend.components.llm_selector import LLMSelector
+from frontend.utils.resources import get_kb_manager, get_search_agent
+
+try:
+    import uvloop  # Boucle d'événements plus rapide, optionnelle (indisponible sous Windows)
+except ImportError:
+    uvloop = None
 
 async def main():
     # Configuration initiale
@@ -36,7 +40,7 @@ async def main():
 
     try:
         # Initialisation des gestionnaires
-        kb_manager = KnowledgeBaseManager(storage_directory=str(storage_dir))
+        kb_manager = get_kb_manager(str(storage_dir))
         llm_selector = LLMSelector()
 
         # Organisation de la sidebar avec tabs
@@ -92,10 +96,22 @@ async def main():
         # Interface de chat principale
         st.title("💬 Assistant Documentaire Demo")
         
-        # Initialisation des agents avec le LLM sélectionné
-        query_mapper = QueryKBMapper(kb_manager, llm)
-        search_agent = SearchAgent(kb_manager)
-        orchestrator = AgentOrchestrator(kb_manager, query_mapper, search_agent, llm)
+        # Initialisation des agents avec le LLM sélectionné : reconstruits uniquement
+        # quand la configuration du modèle change (l'orchestrateur porte l'historique
+        # de conversation, il reste donc propre à la session)
+        llm_key = (
+            st.session_state.llm_provider,
+            st.session_state.llm_model,
+            st.session_state.llm_temperature,
+            st.session_state.llm_max_tokens
+        )
+        cached_agents = st.session_state.get('_agents_cache')
+        if cached_agents is None or cached_agents[0] != llm_key:
+            query_mapper = QueryKBMapper(kb_manager, llm)
+            search_agent = get_search_agent(str(storage_dir), kb_manager)
+            cached_agents = (llm_key, AgentOrchestrator(kb_manager, query_mapper, search_agent, llm))
+            st.session_state._agents_cache = cached_agents
+        orchestrator = cached_agents[1]
         
         chat_window = ChatWindow(orchestrator)
         await chat_window.render(active_filters)
@@ -104,4 +120,4 @@ async def main():
         st.error(f"Erreur lors de l'initialisation de l'application: {str(e)}")
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    (uvloop.run if uvloop else asyncio.run)(main())
\ No newline at end of file
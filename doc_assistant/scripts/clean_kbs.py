@@ -24,9 +24,10 @@ Simuler le nettoyage de toutes les bases avec un dossier de stockage personnalis
     python scripts/clean_kbs.py --all --dry-run --storage-dir /path/to/storage
 """
 
-import os
 import sys
 import argparse
+import io
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, Dict
@@ -84,33 +85,35 @@ def create_report(
         "migrations": migration_map
     }
 
-def save_report(reports: list, storage_dir: str):
+def save_report(reports: list, storage_path: Path) -> Path:
     """Sauvegarde le rapport de migration"""
-    reports_dir = os.path.join(os.path.expanduser(storage_dir), "reports")
-    os.makedirs(reports_dir, exist_ok=True)
+    reports_dir = storage_path / "reports"
+    reports_dir.mkdir(parents=True, exist_ok=True)
     
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    report_path = os.path.join(reports_dir, f"cleanup_report_{timestamp}.txt")
-    
-    with open(report_path, "w", encoding="utf-8") as f:
-        f.write(f"Rapport de nettoyage des bases - {datetime.now()}\n")
-        f.write("-" * 50 + "\n\n")
+    report_path = reports_dir / f"cleanup_report_{timestamp}.txt"
+    
+    # Rapport construit en mémoire puis écrit en une seule fois
+    buf = io.StringIO()
+    w = buf.write
+    w(f"Rapport de nettoyage des bases - {datetime.now()}\n")
+    w("-" * 50 + "\n\n")
+    
+    for report in reports:
+        w(f"Base: {report['kb_id']}\n")
+        w(f"Documents traités: {report['documents_processed']}\n")
+        w(f"Statut: {'✅ Succès' if report['success'] else '❌ Échec'}\n")
         
-        for report in reports:
-            f.write(f"Base: {report['kb_id']}\n")
-            f.write(f"Documents traités: {report['documents_processed']}\n")
-            f.write(f"Statut: {'✅ Succès' if report['success'] else '❌ Échec'}\n")
+        if report['error']:
+            w(f"Erreur: {report['error']}\n")
             
-            if report['error']:
-                f.write(f"Erreur: {report['error']}\n")
+        if report['migrations']:
+            w("\nMigrations effectuées:\n")
+            w("".join(f"  {old_id} -> {new_id}\n" for old_id, new_id in report['migrations'].items()))
                 
-            if report['migrations']:
-                f.write("\nMigrations effectuées:\n")
-                for old_id, new_id in report['migrations'].items():
-                    f.write(f"  {old_id} -> {new_id}\n")
-                    
-            f.write("\n" + "-" * 50 + "\n\n")
-            
+        w("\n" + "-" * 50 + "\n\n")
+    
+    report_path.write_text(buf.getvalue(), encoding="utf-8")
     return report_path
 
 def clean_knowledge_base(
@@ -153,29 +156,31 @@ def main():
     args = parser.parse_args()
     
     # Initialiser le gestionnaire de bases
-    storage_dir = os.path.expanduser(args.storage_dir)
-    kb_manager = KnowledgeBaseManager(storage_directory=storage_dir)
+    # Chemin résolu une seule fois, réutilisé pour le gestionnaire et le rapport
+    storage_path = Path(args.storage_dir).expanduser()
+    kb_manager = KnowledgeBaseManager(storage_directory=str(storage_path))
     
     # Récupérer la liste des bases
     available_kbs = kb_manager.list_knowledge_bases()
-    if not available_kbs:
+    # Index par identifiant : un seul parcours, test d'appartenance en O(1)
+    kb_by_id = {kb["id"]: kb for kb in available_kbs}
+    if not kb_by_id:
         print("❌ Aucune base de connaissances trouvée")
         return
         
     # Mode liste si aucune base spécifiée
     if not args.kb_id and not args.all:
         print("\n📚 Bases de connaissances disponibles:")
-        for kb in available_kbs:
-            print(f"  - {kb['id']}: {kb['title']}")
+        for kb_id, kb in kb_by_id.items():
+            print(f"  - {kb_id}: {kb['title']}")
         print("\nUtilisez --kb-id <ID> ou --all pour nettoyer une ou toutes les bases")
         return
         
     # Déterminer les bases à traiter
-    kbs_to_clean = []
     if args.all:
-        kbs_to_clean = [kb["id"] for kb in available_kbs]
-    elif args.kb_id:
-        if args.kb_id not in [kb["id"] for kb in available_kbs]:
+        kbs_to_clean = list(kb_by_id)
+    else:
+        if args.kb_id not in kb_by_id:
             print(f"❌ Base {args.kb_id} introuvable")
             return
         kbs_to_clean = [args.kb_id]
@@ -184,18 +189,27 @@ def main():
     if args.dry_run:
         print("\n🔍 MODE SIMULATION - Aucune modification ne sera effectuée")
         
-    reports = []
     total_kbs = len(kbs_to_clean)
-    
-    # Traiter chaque base
-    for idx, kb_id in enumerate(kbs_to_clean, 1):
-        print(f"\n[{idx}/{total_kbs}] Traitement de {kb_id}")
-        report = clean_knowledge_base(kb_manager, kb_id, args.dry_run)
-        reports.append(report)
+    reports_by_kb = {}
+    
+    # Traiter les bases en parallèle : chaque base est indépendante et l'analyse
+    # est dominée par les lectures SQLite/Chroma
+    with ThreadPoolExecutor(max_workers=min(8, total_kbs)) as pool:
+        futures = {
+            pool.submit(clean_knowledge_base, kb_manager, kb_id, args.dry_run): kb_id
+            for kb_id in kbs_to_clean
+        }
+        for idx, future in enumerate(as_completed(futures), 1):
+            kb_id = futures[future]
+            reports_by_kb[kb_id] = future.result()
+            print(f"\n[{idx}/{total_kbs}] Base {kb_id} traitée")
+    
+    # Rapport dans l'ordre des bases demandées
+    reports = [reports_by_kb[kb_id] for kb_id in kbs_to_clean]
         
     # Sauvegarder le rapport si des changements ont été effectués
     if not args.dry_run and any(report['migrations'] for report in reports):
-        report_path = save_report(reports, storage_dir)
+        report_path = save_report(reports, storage_path)
         print(f"\n📝 Rapport détaillé sauvegardé: {report_path}")
         
     # Résumé final
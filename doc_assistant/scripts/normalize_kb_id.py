@@ -2,11 +2,14 @@ import os
 import sys
 import argparse
 from pathlib import Path
-import json
 from typing import Dict, List, Any
 import logging
 from datetime import datetime
 import shutil
+import sqlite3
+from contextlib import closing
+import subprocess
+from importlib import metadata as importlib_metadata
 
 # Ajouter le répertoire parent au PYTHONPATH pour les imports
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -19,17 +22,44 @@ from dsrag.knowledge_base import KnowledgeBase
 from dotenv import load_dotenv
 
 load_dotenv()
-# Configuration du logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler(f'kb_normalization_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log')
-    ]
-)
 logger = logging.getLogger(__name__)
 
+# Version de dsRAG dont rename_document reproduit le format de stockage
+_DSRAG_STORAGE_VERSION = "0.4.1"
+
+def setup_logging(dry_run: bool) -> None:
+    """Configure le logging ; aucun fichier de log n'est créé en mode dry run"""
+    handlers = [logging.StreamHandler()]
+    if not dry_run:
+        handlers.append(logging.FileHandler(f'kb_normalization_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'))
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=handlers
+    )
+
+def _snapshot_tree(src: Path, dst: Path) -> None:
+    """
+    Copie une arborescence en clonant les fichiers (reflink) lorsque le système de fichiers
+    le permet (btrfs, XFS, APFS...) : pas de recopie des octets ni d'espace disque consommé.
+    Les liens physiques sont exclus : SQLite et l'index HNSW modifient leurs fichiers sur place,
+    ce qui altérerait aussi la sauvegarde.
+    """
+    if sys.platform.startswith('linux'):
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        # GNU cp : --reflink=auto revient à une copie classique si le clonage est impossible
+        result = subprocess.run(
+            ['cp', '-a', '--reflink=auto', str(src), str(dst)],
+            capture_output=True
+        )
+        if result.returncode == 0:
+            return
+        logger.warning("Copie par clonage impossible, copie classique: %s", result.stderr.decode(errors='replace').strip())
+    if src.is_dir():
+        shutil.copytree(src, dst, dirs_exist_ok=True)
+    else:
+        shutil.copy2(src, dst)
+
 def create_backup(kb_path: Path, backup_dir: Path) -> bool:
     """
     Crée une sauvegarde des fichiers de la base de connaissances.
@@ -42,29 +72,104 @@ def create_backup(kb_path: Path, backup_dir: Path) -> bool:
 
         # Copier tous les fichiers liés à la base
         if kb_path.exists():
-            shutil.copytree(kb_path, backup_path / kb_path.name, dirs_exist_ok=True)
-            logger.info(f"Backup créé avec succès dans {backup_path}")
+            _snapshot_tree(kb_path, backup_path / kb_path.name)
+            logger.info("Backup créé avec succès dans %s", backup_path)
             return True
     except Exception as e:
-        logger.error(f"Erreur lors de la création du backup: {str(e)}")
+        logger.error("Erreur lors de la création du backup: %s", e)
         return False
     
+def rename_document(kb: KnowledgeBase, old_id: str, new_id: str, metadata: Dict[str, Any]) -> None:
+    """
+    Renomme un document sans le réindexer : les vecteurs Chroma sont recopiés sous le nouvel
+    identifiant avec leurs embeddings existants, puis la clé des chunks SQLite est mise à jour
+    (et le dossier des images de pages, s'il existe, est renommé).
+    Aucun appel d'embedding ni de LLM. En cas d'échec, les vecteurs ajoutés sont retirés
+    et l'exception est propagée (l'ancien document reste intact).
+    
+    Suit le stockage de dsRAG 0.4.1 : vecteurs d'id "<doc_id>_<chunk_index>" dont les
+    métadonnées reprennent celles du document, chunks dans chunk_storage/<kb_id>.db
+    (table documents, métadonnées sérialisées par str() et relues par eval()).
+    dsRAG n'offrant aucune API de renommage, ce format interne n'est utilisé qu'avec
+    cette version exacte (épinglée dans requirements.txt) : toute autre version lève
+    RuntimeError et normalize_kb_ids repasse par add_document/delete_document.
+    """
+    try:
+        installed = importlib_metadata.version("dsrag")
+    except importlib_metadata.PackageNotFoundError:
+        installed = None
+    if installed != _DSRAG_STORAGE_VERSION:
+        raise RuntimeError(
+            f"Renommage en place validé pour dsRAG {_DSRAG_STORAGE_VERSION} uniquement (installé : {installed})"
+        )
+
+    collection = kb.vector_db.collection
+    existing = collection.get(where={"doc_id": old_id}, include=["embeddings", "metadatas"])
+    old_vector_ids = existing["ids"]
+    new_vector_ids = [
+        f"{new_id}_{vector_metadata.get('chunk_index', idx)}"
+        for idx, vector_metadata in enumerate(existing["metadatas"])
+    ]
+    
+    if old_vector_ids:
+        collection.add(
+            ids=new_vector_ids,
+            embeddings=existing["embeddings"],
+            metadatas=[
+                {
+                    **vector_metadata,
+                    "doc_id": new_id,
+                    "original_doc_id": old_id,
+                    "normalized_id": True
+                }
+                for vector_metadata in existing["metadatas"]
+            ]
+        )
+    try:
+        # Une seule transaction : tous les chunks du document changent de clé ensemble
+        # (closing : le gestionnaire de contexte de sqlite3 valide mais ne ferme pas)
+        chunk_db_file = os.path.join(kb.chunk_db.db_path, f"{kb.kb_id}.db")
+        with closing(sqlite3.connect(chunk_db_file)) as conn, conn:
+            cursor = conn.execute(
+                "UPDATE documents SET doc_id = ?, metadata = ? WHERE doc_id = ?",
+                (new_id, str(metadata), old_id)
+            )
+            if cursor.rowcount == 0:
+                raise LookupError(f"Aucun chunk pour {old_id} dans {chunk_db_file}")
+    except Exception:
+        if old_vector_ids:
+            collection.delete(ids=new_vector_ids)
+        raise
+    
+    if old_vector_ids:
+        collection.delete(ids=old_vector_ids)
+    
+    # Images de pages (ingestion VLM) rangées par doc_id sur le système de fichiers local
+    base_path = getattr(kb.file_system, 'base_path', None)
+    if base_path:
+        old_images = os.path.join(base_path, kb.kb_id, old_id)
+        if os.path.isdir(old_images):
+            os.rename(old_images, os.path.join(base_path, kb.kb_id, new_id))
+
 def get_id_mapping(kb: KnowledgeBase) -> Dict[str, str]:
     """
     Génère un mapping entre les anciens et nouveaux doc_ids.
+    Seuls les documents à renommer y figurent.
     """
     id_mapping = {}
     doc_ids = kb.chunk_db.get_all_doc_ids()
     
     for old_id in doc_ids:
+        new_id = StringNormalizer.normalize_doc_id(old_id)
+        # ID déjà propre : inutile de lire les métadonnées
+        if new_id == old_id:
+            continue
+        
         # Récupérer les métadonnées pour voir si le doc_id a déjà été normalisé
         doc_info = kb.chunk_db.get_document(old_id)
         if doc_info and 'metadata' in doc_info and doc_info['metadata'].get('normalized_id'):
             # Si déjà normalisé, garder le même ID
-            new_id = old_id
-        else:
-            # Sinon, générer un nouveau doc_id normalisé
-            new_id = StringNormalizer.normalize_doc_id(old_id)
+            continue
             
         id_mapping[old_id] = new_id
         
@@ -80,35 +185,37 @@ def normalize_kb_ids(kb_id: str, storage_dir: str, dry_run: bool = True) -> bool
         dry_run: Si True, simule seulement les changements
     """
     try:
-        logger.info(f"{'[DRY RUN] ' if dry_run else ''}Début de la normalisation de la base {kb_id}")
+        logger.info("%sDébut de la normalisation de la base %s", '[DRY RUN] ' if dry_run else '', kb_id)
         
         # Initialiser le manager et charger la base
+        storage_path = Path(storage_dir)
         kb_manager = KnowledgeBaseManager(storage_directory=storage_dir)
         kb = kb_manager.load_knowledge_base(kb_id)
         
         if not kb:
-            logger.error(f"Base {kb_id} introuvable")
+            logger.error("Base %s introuvable", kb_id)
             return False
             
         # Créer un backup si ce n'est pas un dry run
         if not dry_run:
-            kb_path = Path(storage_dir) / "vector_storage" / kb_id
-            backup_dir = Path(storage_dir) / "backups"
-            if not create_backup(kb_path, backup_dir):
-                logger.error("Échec de la création du backup. Arrêt de la normalisation.")
-                return False
+            backup_dir = storage_path / "backups"
+            # Vecteurs et chunks : les deux sont modifiés par le renommage
+            for kb_path in (
+                storage_path / "vector_storage" / kb_id,
+                storage_path / "chunk_storage" / f"{kb_id}.db"
+            ):
+                if not create_backup(kb_path, backup_dir):
+                    logger.error("Échec de la création du backup. Arrêt de la normalisation.")
+                    return False
         
         # Obtenir le mapping des IDs
         id_mapping = get_id_mapping(kb)
         
         # Afficher les changements prévus
-        changes_detected = False
         for old_id, new_id in id_mapping.items():
-            if old_id != new_id:
-                changes_detected = True
-                logger.info(f"Document à renommer: {old_id} -> {new_id}")
+            logger.info("Document à renommer: %s -> %s", old_id, new_id)
         
-        if not changes_detected:
+        if not id_mapping:
             logger.info("Aucune normalisation nécessaire")
             return True
             
@@ -121,14 +228,11 @@ def normalize_kb_ids(kb_id: str, storage_dir: str, dry_run: bool = True) -> bool
         error_count = 0
         
         for old_id, new_id in id_mapping.items():
-            if old_id == new_id:
-                continue
-                
             try:
                 # Récupérer le document complet
                 doc_info = kb.chunk_db.get_document(old_id, include_content=True)
                 if not doc_info:
-                    logger.warning(f"Document {old_id} non trouvé, passage au suivant")
+                    logger.warning("Document %s non trouvé, passage au suivant", old_id)
                     continue
                 
                 # Mettre à jour les métadonnées
@@ -136,35 +240,40 @@ def normalize_kb_ids(kb_id: str, storage_dir: str, dry_run: bool = True) -> bool
                 metadata['original_doc_id'] = old_id
                 metadata['normalized_id'] = True
                 
-                # Réinjecter le document avec le nouvel ID
-                kb.add_document(
-                    doc_id=new_id,
-                    text=doc_info.get('content', ''),
-                    metadata=metadata,
-                    auto_context_config={"use_generated_title": False}
-                )
-                
-                # Supprimer l'ancien document
-                kb.delete_document(old_id)
+                try:
+                    # Renommage en place : embeddings et chunks existants réutilisés
+                    rename_document(kb, old_id, new_id, metadata)
+                except Exception as e:
+                    logger.warning("Renommage en place impossible pour %s (%s), réindexation complète", old_id, e)
+                    # Réinjecter le document avec le nouvel ID
+                    kb.add_document(
+                        doc_id=new_id,
+                        text=doc_info.get('content', ''),
+                        metadata=metadata,
+                        auto_context_config={"use_generated_title": False}
+                    )
+                    
+                    # Supprimer l'ancien document
+                    kb.delete_document(old_id)
                 
                 success_count += 1
-                logger.info(f"Document {old_id} renommé avec succès en {new_id}")
+                logger.info("Document %s renommé avec succès en %s", old_id, new_id)
                 
             except Exception as e:
                 error_count += 1
-                logger.error(f"Erreur lors du traitement de {old_id}: {str(e)}")
+                logger.error("Erreur lors du traitement de %s: %s", old_id, e)
                 
         # Rapport final
-        logger.info(f"""
+        logger.info("""
         Normalisation terminée:
-        - Documents traités avec succès: {success_count}
-        - Erreurs: {error_count}
-        """)
+        - Documents traités avec succès: %s
+        - Erreurs: %s
+        """, success_count, error_count)
         
         return error_count == 0
         
     except Exception as e:
-        logger.error(f"Erreur lors de la normalisation: {str(e)}")
+        logger.error("Erreur lors de la normalisation: %s", e)
         return False
 
 def main():
@@ -176,6 +285,7 @@ def main():
                        help='Simule les changements sans les appliquer')
     
     args = parser.parse_args()
+    setup_logging(args.dry_run)
     
     # Expandre le chemin utilisateur
     storage_dir = os.path.expanduser(args.storage_dir)
@@ -1,13 +1,27 @@
 import re
 import hashlib
 import unicodedata
+from functools import lru_cache
 from typing import Optional
 import os
 
+# Table de conversion ASCII (le nom est en ASCII après l'étape 2) : apostrophes et guillemets
+# vers '_', tout autre caractère hors [a-z0-9_] vers '-', en une seule passe C (str.translate)
+_ALLOWED_CHARS = frozenset('abcdefghijklmnopqrstuvwxyz0123456789_')
+_TRANS = str.maketrans({
+    chr(code): '_' if chr(code) in '\'"' else '-'
+    for code in range(128)
+    if chr(code) not in _ALLOWED_CHARS
+})
+# Expression compilée une seule fois au chargement du module
+_DUP_RE = re.compile(r'[-_]+')
+
+@lru_cache(maxsize=8192)
 def normalize_doc_id(filename: str, max_length: int = 100, use_hash: bool = True) -> str:
     """
     Normalise un nom de fichier pour créer un doc_id compatible avec SQLite.
     Remplace les caractères spéciaux problématiques comme les apostrophes et guillemets par des underscores.
+    Résultat mémoïsé : un même nom de fichier rencontré dans plusieurs bases n'est traité qu'une fois.
    
     Args:
         filename: Le nom de fichier original
@@ -27,14 +41,12 @@ def normalize_doc_id(filename: str, max_length: int = 100, use_hash: bool = True
     # 2. Normaliser les caractères accentués
     name = unicodedata.normalize('NFKD', name).encode('ASCII', 'ignore').decode('utf-8')
    
-    # 3. Remplacer spécifiquement les apostrophes et guillemets par des underscores
-    name = re.sub(r'[\'"]', '_', name)
-   
-    # 4. Remplacer les autres caractères spéciaux par des tirets
-    name = re.sub(r'[^a-z0-9_]+', '-', name)  # Modifié pour préserver les underscores
+    # 3-4. Apostrophes et guillemets vers des underscores, autres caractères spéciaux
+    # vers des tirets (les underscores sont préservés)
+    name = name.translate(_TRANS)
    
     # 5. Supprimer les tirets et underscores multiples
-    name = re.sub(r'[-_]+', '-', name)
+    name = _DUP_RE.sub('-', name)
    
     # 6. Supprimer les tirets aux extrémités
     name = name.strip('-')
@@ -45,7 +57,7 @@ def normalize_doc_id(filename: str, max_length: int = 100, use_hash: bool = True
    
     # 8. Ajouter un hash si demandé
     if use_hash:
-        hash_suffix = hashlib.md5(filename.encode()).hexdigest()[:8]
+        hash_suffix = hashlib.blake2s(filename.encode(), digest_size=4).hexdigest()
         name = f"{name}-{hash_suffix}"
    
     # 9. S'assurer que l'ID commence par une lettre
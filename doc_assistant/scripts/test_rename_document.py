@@ -0,0 +1,122 @@
+import hashlib
+import shutil
+import tempfile
+
+import pytest
+
+pytest.importorskip("dsrag")
+
+from dsrag.knowledge_base import KnowledgeBase
+from dsrag.embedding import Embedding
+from dsrag.reranker import NoReranker
+from dsrag.database.vector.chroma_db import ChromaDB
+from dsrag.database.chunk.sqlite_db import SQLiteDB
+import normalize_kb_id
+from normalize_kb_id import rename_document
+
+_KB_ID = "test_rename_kb"
+# Ni titre, ni résumé, ni sectionnement sémantique : aucun appel LLM pendant l'ingestion
+_INGEST_CONFIG = {
+    "auto_context_config": {
+        "use_generated_title": False,
+        "get_document_summary": False,
+        "get_section_summaries": False,
+    },
+    "semantic_sectioning_config": {"use_semantic_sectioning": False},
+    "chunk_size": 400,
+    "min_length_for_chunking": 100,
+}
+
+class FakeEmbedding(Embedding):
+    """Embedding déterministe calculé localement (pas d'appel API)"""
+    def __init__(self, dimension: int = 8):
+        super().__init__(dimension)
+
+    def get_embeddings(self, text, input_type=None):
+        texts = [text] if isinstance(text, str) else text
+        vectors = [
+            [byte / 255 for byte in hashlib.sha256(t.encode()).digest()[:self.dimension]]
+            for t in texts
+        ]
+        return vectors[0] if isinstance(text, str) else vectors
+
+def _create_kb(storage: str) -> KnowledgeBase:
+    return KnowledgeBase(
+        _KB_ID,
+        storage_directory=storage,
+        embedding_model=FakeEmbedding(),
+        reranker=NoReranker(),
+        vector_db=ChromaDB(_KB_ID, storage_directory=storage),
+        chunk_db=SQLiteDB(_KB_ID, storage_directory=storage),
+        exists_ok=False,
+    )
+
+# Tests de validation
+def test_rename_document_keeps_chunks_vectors_and_metadata():
+    storage = tempfile.mkdtemp()
+    try:
+        kb = _create_kb(storage)
+        old_id, new_id = "Mon Document.TXT", "mon_document.txt"
+        text = "\n\n".join(f"Paragraphe {i}: " + "mot " * 120 for i in range(12))
+        kb.add_document(old_id, text=text, document_title="Titre", metadata={"source": "test"}, **_INGEST_CONFIG)
+
+        collection = kb.vector_db.collection
+        before = collection.get(where={"doc_id": old_id}, include=["embeddings", "metadatas"])
+        old_doc = kb.chunk_db.get_document(old_id, include_content=True)
+        assert len(before["ids"]) > 1
+
+        metadata = {**old_doc["metadata"], "original_doc_id": old_id, "normalized_id": True}
+        rename_document(kb, old_id, new_id, metadata)
+
+        # Relecture depuis le disque
+        chunk_db = SQLiteDB(_KB_ID, storage_directory=storage)
+        assert chunk_db.get_all_doc_ids() == [new_id]
+        assert chunk_db.get_document(old_id) is None
+        new_doc = chunk_db.get_document(new_id, include_content=True)
+        assert new_doc["metadata"] == metadata
+        assert new_doc["content"] == old_doc["content"]
+
+        collection = ChromaDB(_KB_ID, storage_directory=storage).collection
+        after = collection.get(where={"doc_id": new_id}, include=["embeddings", "metadatas"])
+        assert len(after["ids"]) == len(before["ids"])
+        assert sorted(after["ids"]) == sorted(f"{new_id}_{i}" for i in range(len(before["ids"])))
+        assert not collection.get(where={"doc_id": old_id})["ids"]
+
+        # Embeddings repris tels quels, métadonnées de chunk conservées
+        old_vectors = {m["chunk_index"]: (list(e), m) for e, m in zip(before["embeddings"], before["metadatas"])}
+        for embedding, vector_metadata in zip(after["embeddings"], after["metadatas"]):
+            old_embedding, old_metadata = old_vectors[vector_metadata["chunk_index"]]
+            assert list(embedding) == pytest.approx(old_embedding)
+            assert vector_metadata["chunk_text"] == old_metadata["chunk_text"]
+            assert vector_metadata["original_doc_id"] == old_id
+            assert vector_metadata["normalized_id"] is True
+    finally:
+        shutil.rmtree(storage, ignore_errors=True)
+
+def test_rename_document_missing_doc_leaves_no_vectors():
+    storage = tempfile.mkdtemp()
+    try:
+        kb = _create_kb(storage)
+        with pytest.raises(LookupError):
+            rename_document(kb, "absent", "nouveau", {})
+        assert not kb.vector_db.collection.get(where={"doc_id": "nouveau"})["ids"]
+    finally:
+        shutil.rmtree(storage, ignore_errors=True)
+
+def test_rename_document_refuses_other_dsrag_version(monkeypatch):
+    storage = tempfile.mkdtemp()
+    try:
+        kb = _create_kb(storage)
+        kb.add_document("doc", text="Paragraphe unique. " * 20, metadata={}, **_INGEST_CONFIG)
+        monkeypatch.setattr(normalize_kb_id, "_DSRAG_STORAGE_VERSION", "0.0.0")
+        # normalize_kb_ids repasse alors par add_document/delete_document
+        with pytest.raises(RuntimeError):
+            rename_document(kb, "doc", "nouveau", {})
+        assert kb.chunk_db.get_all_doc_ids() == ["doc"]
+        assert not kb.vector_db.collection.get(where={"doc_id": "nouveau"})["ids"]
+    finally:
+        shutil.rmtree(storage, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_rename_document_keeps_chunks_vectors_and_metadata()
+    test_rename_document_missing_doc_leaves_no_vectors()